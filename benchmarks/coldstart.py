@@ -0,0 +1,132 @@
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+from statistics import median
+from time import perf_counter, sleep
+
+import httpx
+
+from benchmarks.load import (
+    PASSWORD,
+    TEST_SETTINGS,
+    USER_PREFIX,
+    postgres,
+    seed,
+)
+
+MODES = {'cold': 'false', 'warm': 'true'}
+POLL_SECONDS = 0.01
+STARTUP_TIMEOUT = 60
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(client: httpx.Client, deadline: float):
+    while perf_counter() < deadline:
+        try:
+            if client.get('/').is_success:
+                return
+        except httpx.TransportError:
+            pass
+        sleep(POLL_SECONDS)
+
+    raise TimeoutError('server did not answer in time')
+
+
+def measure(env: dict):
+    port = free_port()
+    started = perf_counter()
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            '-m',
+            'uvicorn',
+            'todo_list_api.app:app',
+            '--port',
+            str(port),
+            '--log-level',
+            'warning',
+        ],
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+    timings = {}
+    try:
+        with httpx.Client(base_url=f'http://127.0.0.1:{port}') as client:
+            wait_until_ready(client, started + STARTUP_TIMEOUT)
+            timings['first_response_ms'] = perf_counter() - started
+
+            response = client.post(
+                '/api/v1/auth/token',
+                data={
+                    'username': f'{USER_PREFIX}0@example.com',
+                    'password': PASSWORD,
+                },
+            )
+            response.raise_for_status()
+            timings['first_login_ms'] = perf_counter() - started
+
+            token = response.json()['access_token']
+            client.get(
+                '/api/v1/todos/',
+                headers={'Authorization': f'Bearer {token}'},
+            ).raise_for_status()
+            timings['first_list_ms'] = perf_counter() - started
+    finally:
+        process.terminate()
+        process.wait()
+
+    return {name: round(value * 1000, 1) for name, value in timings.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Measure time to the first successful requests after '
+        'starting a fresh server process, with and without warm-up.'
+    )
+    parser.add_argument(
+        '--database-url',
+        help='database to seed; default is a throwaway Postgres container',
+    )
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--output', help='write the JSON report here')
+    args = parser.parse_args()
+
+    report = {}
+    with postgres(args.database_url) as database_url:
+        asyncio.run(seed(database_url, users=1, todos=100, random_seed=0))
+        env = {
+            **os.environ,
+            **TEST_SETTINGS,
+            'DATABASE_URL': database_url,
+        }
+        for mode, warmup in MODES.items():
+            runs = [
+                measure({**env, 'STARTUP_WARMUP': warmup})
+                for _ in range(args.runs)
+            ]
+            report[mode] = {
+                'runs': runs,
+                'median': {
+                    name: median(run[name] for run in runs) for name in runs[0]
+                },
+            }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,358 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+from collections import defaultdict
+from contextlib import contextmanager
+from statistics import quantiles
+from time import perf_counter
+
+import httpx
+from sqlalchemy.ext.asyncio import create_async_engine
+from testcontainers.postgres import PostgresContainer
+
+from todo_list_api.models.registry import table_registry
+from todo_list_api.seed import SeedOptions, seed_database
+
+DEFAULT_MIX = {
+    'login': 5,
+    'list': 35,
+    'filter': 20,
+    'create': 15,
+    'patch': 15,
+    'delete': 10,
+}
+PASSWORD = 'benchmark'
+USER_PREFIX = 'bench'
+STATES = ('draft', 'todo', 'doing', 'done')
+TEST_SETTINGS = {
+    'SECRET_KEY': 'benchmark-secret-key-with-enough-bytes',
+    'ALGORITHM': 'HS256',
+    'ACCESS_TOKEN_EXPIRE_MINUTES': '30',
+}
+
+
+@contextmanager
+def postgres(database_url: str | None):
+    if database_url:
+        yield database_url
+        return
+
+    with PostgresContainer('postgres:17', driver='psycopg') as container:
+        yield container.get_connection_url()
+
+
+def configure(database_url: str):
+    os.environ['DATABASE_URL'] = database_url
+    for name, value in TEST_SETTINGS.items():
+        os.environ.setdefault(name, value)
+
+
+async def seed(database_url: str, users: int, todos: int, random_seed: int):
+    engine = create_async_engine(database_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(table_registry.metadata.drop_all)
+        await conn.run_sync(table_registry.metadata.create_all)
+    await engine.dispose()
+
+    await seed_database(
+        database_url,
+        SeedOptions(
+            users=users,
+            todos=todos,
+            password=PASSWORD,
+            prefix=USER_PREFIX,
+            seed=random_seed,
+        ),
+    )
+
+
+def make_client(url: str | None):
+    if url:
+        return httpx.AsyncClient(base_url=url, timeout=30)
+
+    from todo_list_api.app import app  # noqa: PLC0415
+
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url='http://benchmark',
+        timeout=30,
+    )
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, email: str, rng):
+        self.client = client
+        self.email = email
+        self.rng = rng
+        self.headers = {}
+        self.todo_ids = []
+
+    async def login(self):
+        response = await self.client.post(
+            '/api/v1/auth/token',
+            data={'username': self.email, 'password': PASSWORD},
+        )
+        if response.is_success:
+            token = response.json()['access_token']
+            self.headers = {'Authorization': f'Bearer {token}'}
+        return response
+
+    async def list(self):
+        response = await self.client.get(
+            '/api/v1/todos/', params={'limit': 20}, headers=self.headers
+        )
+        if response.is_success:
+            self.todo_ids = [todo['id'] for todo in response.json()['todos']]
+        return response
+
+    async def filter(self):
+        return await self.client.get(
+            '/api/v1/todos/',
+            params={
+                'state': self.rng.choice(STATES),
+                'order_by': 'updated_at',
+                'limit': 20,
+            },
+            headers=self.headers,
+        )
+
+    async def create(self):
+        response = await self.client.post(
+            '/api/v1/todos/',
+            json={
+                'title': f'load {self.rng.random():.6f}',
+                'description': 'Created by the load benchmark',
+                'state': self.rng.choice(STATES),
+            },
+            headers=self.headers,
+        )
+        if response.is_success:
+            self.todo_ids.append(response.json()['id'])
+        return response
+
+    async def patch(self):
+        if not self.todo_ids:
+            return await self.create()
+
+        return await self.client.patch(
+            f'/api/v1/todos/{self.rng.choice(self.todo_ids)}',
+            json={'state': self.rng.choice(STATES)},
+            headers=self.headers,
+        )
+
+    async def delete(self):
+        if not self.todo_ids:
+            return await self.create()
+
+        todo_id = self.todo_ids.pop(self.rng.randrange(len(self.todo_ids)))
+        return await self.client.delete(
+            f'/api/v1/todos/{todo_id}', headers=self.headers
+        )
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.recording = False
+
+    def record(self, operation: str, seconds: float, response):
+        if not self.recording:
+            return
+
+        self.samples[operation].append(seconds)
+        if not response.is_success:
+            self.errors[operation] += 1
+
+
+async def drive(user: VirtualUser, mix: dict, deadline: float, recorder):
+    operations, weights = list(mix), list(mix.values())
+    started = perf_counter()
+    response = await user.login()
+    recorder.record('login', perf_counter() - started, response)
+
+    while perf_counter() < deadline:
+        operation = user.rng.choices(operations, weights)[0]
+        started = perf_counter()
+        response = await getattr(user, operation)()
+        recorder.record(operation, perf_counter() - started, response)
+
+
+def percentile(samples: list[float], q: int):
+    if len(samples) == 1:
+        return samples[0]
+    return quantiles(samples, n=100, method='inclusive')[q - 1]
+
+
+def summarize(samples: list[float], errors: int, seconds: float):
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'rps': round(len(samples) / seconds, 2),
+        'p50_ms': round(percentile(samples, 50) * 1000, 3),
+        'p95_ms': round(percentile(samples, 95) * 1000, 3),
+        'p99_ms': round(percentile(samples, 99) * 1000, 3),
+    }
+
+
+def build_report(recorder: Recorder, seconds: float, config: dict):
+    endpoints = {
+        operation: summarize(samples, recorder.errors[operation], seconds)
+        for operation, samples in sorted(recorder.samples.items())
+    }
+    every_sample = [
+        sample for samples in recorder.samples.values() for sample in samples
+    ]
+    total = (
+        summarize(every_sample, sum(recorder.errors.values()), seconds)
+        if every_sample
+        else {}
+    )
+    return {'config': config, 'endpoints': endpoints, 'total': total}
+
+
+def compare(report: dict, baseline: dict, tolerance: float):
+    regressions = []
+    for operation, expected in baseline['endpoints'].items():
+        actual = report['endpoints'].get(operation)
+        if actual is None:
+            regressions.append(f'{operation}: missing from this run')
+            continue
+
+        if actual['rps'] < expected['rps'] * (1 - tolerance):
+            regressions.append(
+                f'{operation}: {actual["rps"]} rps is below the baseline '
+                f'of {expected["rps"]} rps'
+            )
+        for key in ('p50_ms', 'p95_ms', 'p99_ms'):
+            if actual[key] > expected[key] * (1 + tolerance):
+                regressions.append(
+                    f'{operation}: {key} {actual[key]} is above the '
+                    f'baseline of {expected[key]}'
+                )
+        if actual['errors'] > expected['errors']:
+            regressions.append(
+                f'{operation}: {actual["errors"]} errors, baseline had '
+                f'{expected["errors"]}'
+            )
+
+    return regressions
+
+
+def parse_mix(value: str):
+    mix = {}
+    for part in value.split(','):
+        operation, _, weight = part.partition('=')
+        if operation not in DEFAULT_MIX or not weight.isdigit():
+            raise argparse.ArgumentTypeError(f'invalid mix entry {part!r}')
+        mix[operation] = int(weight)
+
+    return mix
+
+
+async def run(args, database_url: str):
+    if not args.skip_seed:
+        await seed(database_url, args.users, args.todos, args.seed)
+
+    recorder = Recorder()
+    async with make_client(args.url) as client:
+        users = [
+            VirtualUser(
+                client,
+                f'{USER_PREFIX}{index % args.users}@example.com',
+                random.Random(args.seed + index),
+            )
+            for index in range(args.concurrency)
+        ]
+        start = perf_counter()
+        deadline = start + args.warmup + args.duration
+        tasks = [
+            asyncio.create_task(drive(user, args.mix, deadline, recorder))
+            for user in users
+        ]
+        await asyncio.sleep(args.warmup)
+        recorder.recording = True
+        measured = perf_counter()
+        await asyncio.gather(*tasks)
+        seconds = perf_counter() - measured
+
+    config = {
+        'target': args.url or 'asgi',
+        'cpus': os.cpu_count(),
+        'python': sys.version.split()[0],
+        'users': args.users,
+        'todos': args.todos,
+        'concurrency': args.concurrency,
+        'duration': args.duration,
+        'warmup': args.warmup,
+        'mix': args.mix,
+        'seed': args.seed,
+    }
+    return build_report(recorder, seconds, config)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Drive a request mix against the API and report '
+        'throughput and latency per endpoint.'
+    )
+    parser.add_argument(
+        '--url', help='base URL of a running server; default is in-process'
+    )
+    parser.add_argument(
+        '--database-url',
+        help='database to run against; default is a throwaway Postgres '
+        'container',
+    )
+    parser.add_argument(
+        '--reset-database',
+        action='store_true',
+        help='drop every table in --database-url before seeding it',
+    )
+    parser.add_argument('--skip-seed', action='store_true')
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--todos', type=int, default=10_000)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--warmup', type=float, default=5)
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the JSON report here')
+    parser.add_argument(
+        '--baseline',
+        help='fail on regression against it, e.g. benchmarks/baseline.json',
+    )
+    parser.add_argument('--tolerance', type=float, default=0.1)
+    args = parser.parse_args()
+    if args.url and not args.database_url and not args.skip_seed:
+        parser.error('--url needs --database-url or --skip-seed')
+    if args.database_url and not args.skip_seed and not args.reset_database:
+        parser.error(
+            'seeding drops every table in --database-url; pass '
+            '--reset-database to confirm or --skip-seed'
+        )
+
+    with postgres(args.database_url) as database_url:
+        configure(database_url)
+        report = asyncio.run(run(args, database_url))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(output + '\n')
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            baseline = json.load(file)
+        if regressions := compare(report, baseline, args.tolerance):
+            print('\n'.join(regressions), file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
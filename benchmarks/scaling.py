@@ -0,0 +1,140 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+import httpx
+
+from benchmarks.coldstart import STARTUP_TIMEOUT, free_port, wait_until_ready
+from benchmarks.load import TEST_SETTINGS, postgres, seed
+
+
+def start_server(workers: int, port: int, env: dict):
+    return subprocess.Popen(
+        [
+            sys.executable,
+            '-m',
+            'gunicorn',
+            'todo_list_api.app:app',
+            '--bind',
+            f'127.0.0.1:{port}',
+        ],
+        env={**env, 'SERVER_WORKERS': str(workers)},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def drive(url: str, database_url: str, args, output: Path):
+    return subprocess.Popen([
+        sys.executable,
+        '-m',
+        'benchmarks.load',
+        '--url',
+        url,
+        '--database-url',
+        database_url,
+        '--skip-seed',
+        '--users',
+        str(args.users),
+        '--concurrency',
+        str(args.concurrency),
+        '--duration',
+        str(args.duration),
+        '--warmup',
+        str(args.warmup),
+        '--mix',
+        args.mix,
+        '--output',
+        str(output),
+    ])
+
+
+def measure(workers: int, args, env: dict, directory: Path):
+    database_url = env['DATABASE_URL']
+    port = free_port()
+    url = f'http://127.0.0.1:{port}'
+    server = start_server(workers, port, env)
+    try:
+        with httpx.Client(base_url=url) as client:
+            wait_until_ready(client, perf_counter() + STARTUP_TIMEOUT)
+
+        outputs = [
+            directory / f'{workers}-{index}.json'
+            for index in range(args.clients)
+        ]
+        drivers = [
+            drive(url, database_url, args, output) for output in outputs
+        ]
+        for driver in drivers:
+            driver.wait()
+    finally:
+        server.terminate()
+        server.wait()
+
+    reports = [json.loads(output.read_text()) for output in outputs]
+    return {
+        'rps': round(sum(report['total']['rps'] for report in reports), 2),
+        'errors': sum(report['total']['errors'] for report in reports),
+        'p95_ms': max(report['total']['p95_ms'] for report in reports),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Measure throughput of the gunicorn server as the '
+        'number of workers grows.'
+    )
+    parser.add_argument(
+        '--database-url',
+        help='database to seed; default is a throwaway Postgres container',
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        nargs='+',
+        default=sorted({1, 2, 4, os.cpu_count() or 1}),
+    )
+    parser.add_argument(
+        '--clients', type=int, default=2, help='load processes per run'
+    )
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--todos', type=int, default=10_000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--warmup', type=float, default=3)
+    parser.add_argument(
+        '--mix', default='list=50,filter=25,create=10,patch=10,delete=5'
+    )
+    parser.add_argument('--output', help='write the JSON report here')
+    args = parser.parse_args()
+
+    results = {}
+    with (
+        postgres(args.database_url) as database_url,
+        tempfile.TemporaryDirectory() as directory,
+    ):
+        asyncio.run(seed(database_url, args.users, args.todos, 0))
+        env = {**os.environ, **TEST_SETTINGS, 'DATABASE_URL': database_url}
+        for workers in args.workers:
+            results[workers] = measure(workers, args, env, Path(directory))
+
+    fewest = min(results)
+    for workers, result in results.items():
+        result['speedup'] = round(result['rps'] / results[fewest]['rps'], 2)
+        result['efficiency'] = round(result['speedup'] * fewest / workers, 2)
+
+    output = json.dumps({'cpus': os.cpu_count(), 'runs': results}, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + '\n', encoding='utf-8')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+import argparse
+from collections import namedtuple
+from dataclasses import asdict
+from datetime import datetime
+from timeit import repeat
+
+from fastapi.responses import JSONResponse
+
+from todo_list_api.models.todos import Todo, TodoState
+from todo_list_api.models.users import User
+from todo_list_api.responses import encode
+from todo_list_api.schemas.todos import TodoResponseList
+from todo_list_api.schemas.users import UserResponseList
+
+TodoRow = namedtuple(
+    'TodoRow', 'id title description state created_at updated_at'
+)
+UserRow = namedtuple('UserRow', 'id username email')
+
+
+def make_todos(items: int):
+    now = datetime(2025, 5, 20, 12, 30, 15, 123456)
+    todos = []
+    for index in range(items):
+        todo = Todo(
+            title=f'todo {index}',
+            description='Buy milk, eggs and bread on the way home',
+            user_id=1,
+            state=TodoState.todo,
+        )
+        todo.id, todo.created_at, todo.updated_at = index, now, now
+        todos.append(todo)
+
+    return todos
+
+
+def make_users(items: int):
+    users = []
+    for index in range(items):
+        user = User(
+            username=f'user{index}',
+            email=f'user{index}@example.com',
+            password='secret',
+        )
+        user.id = index
+        users.append(user)
+
+    return users
+
+
+def pydantic_todos(todos):
+    content = TodoResponseList.model_validate({
+        'todos': [asdict(todo) for todo in todos],
+        'next_cursor': None,
+    })
+    return JSONResponse(content.model_dump(mode='json')).body
+
+
+def rows_todos(rows):
+    return encode(
+        {'todos': [row._asdict() for row in rows], 'next_cursor': None},
+        'application/json',
+    )
+
+
+def rows_todos_msgpack(rows):
+    return encode(
+        {'todos': [row._asdict() for row in rows], 'next_cursor': None},
+        'application/msgpack',
+    )
+
+
+def pydantic_users(users):
+    content = UserResponseList.model_validate(
+        {'users': users, 'next_cursor': None}, from_attributes=True
+    )
+    return JSONResponse(content.model_dump(mode='json')).body
+
+
+def rows_users(rows):
+    return encode(
+        {'users': [row._asdict() for row in rows], 'next_cursor': None},
+        'application/json',
+    )
+
+
+def best_of(fn, arg, number: int):
+    return min(repeat(lambda: fn(arg), number=number, repeat=5)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare list response serialization paths.'
+    )
+    parser.add_argument('--items', type=int, default=500)
+    parser.add_argument('--number', type=int, default=200)
+    args = parser.parse_args()
+
+    todos = make_todos(args.items)
+    todo_rows = [
+        TodoRow(
+            todo.id,
+            todo.title,
+            todo.description,
+            todo.state,
+            todo.created_at,
+            todo.updated_at,
+        )
+        for todo in todos
+    ]
+    users = make_users(args.items)
+    user_rows = [UserRow(user.id, user.username, user.email) for user in users]
+
+    cases = [
+        ('TodoResponseList pydantic', pydantic_todos, todos),
+        ('TodoResponseList orjson', rows_todos, todo_rows),
+        ('TodoResponseList msgpack', rows_todos_msgpack, todo_rows),
+        ('UserResponseList pydantic', pydantic_users, users),
+        ('UserResponseList orjson', rows_users, user_rows),
+    ]
+    for name, fn, arg in cases:
+        seconds = best_of(fn, arg, args.number)
+        print(f'{name:<28} {seconds * 1000:8.3f} ms / {args.items} items')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from benchmarks.serialization import (
+    TodoRow,
+    make_todos,
+    pydantic_todos,
+    rows_todos,
+)
+from todo_list_api.hashing import check_password, hash_password
+from todo_list_api.routers.todos import list_todos_query
+from todo_list_api.schemas.filters import FilterTodo
+from todo_list_api.security import (
+    create_access_token,
+    get_current_user,
+    token_versions,
+)
+
+FILTER_PARAMS = {
+    'title': 'milk',
+    'state': 'todo',
+    'limit': '20',
+    'order_by': 'updated_at',
+}
+PAGE_SIZES = [10, 100, 1000]
+
+
+def complete(coroutine):
+    try:
+        coroutine.send(None)
+    except StopIteration as stop:
+        return stop.value
+
+    coroutine.close()
+    raise RuntimeError('coroutine suspended')
+
+
+@pytest.fixture
+def token():
+    token_versions.set(1, 0)
+    yield create_access_token({'sub': '1', 'ver': 0})
+    token_versions.clear()
+
+
+def test_create_access_token(benchmark):
+    benchmark(create_access_token, {'sub': '1', 'ver': 0})
+
+
+def test_get_current_user_decode(benchmark, token):
+    principal = benchmark(lambda: complete(get_current_user(None, token)))
+
+    assert principal.id == 1
+
+
+def test_hash_password(benchmark):
+    benchmark.pedantic(hash_password, args=('secret-password',), rounds=5)
+
+
+def test_verify_password(benchmark):
+    hashed = hash_password('secret-password')
+
+    assert benchmark.pedantic(
+        check_password, args=('secret-password', hashed), rounds=5
+    )
+
+
+def test_filter_todo_parsing(benchmark):
+    benchmark(FilterTodo.model_validate, FILTER_PARAMS)
+
+
+def test_read_todos_query_construction(benchmark):
+    filters = FilterTodo.model_validate(FILTER_PARAMS)
+
+    benchmark(list_todos_query, 1, filters)
+
+
+def test_read_todos_query_compilation(benchmark):
+    filters = FilterTodo.model_validate(FILTER_PARAMS)
+    dialect = postgresql.psycopg.dialect()
+
+    benchmark(lambda: list_todos_query(1, filters).compile(dialect=dialect))
+
+
+@pytest.mark.parametrize('items', PAGE_SIZES)
+def test_todo_response_list_pydantic(benchmark, items):
+    benchmark(pydantic_todos, make_todos(items))
+
+
+@pytest.mark.parametrize('items', PAGE_SIZES)
+def test_todo_response_list_rows(benchmark, items):
+    rows = [
+        TodoRow(
+            todo.id,
+            todo.title,
+            todo.description,
+            todo.state,
+            todo.created_at,
+            todo.updated_at,
+        )
+        for todo in make_todos(items)
+    ]
+
+    benchmark(rows_todos, rows)
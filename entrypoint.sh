@@ -1,5 +1,6 @@
 #!/bin/sh
+set -e
 
-poetry run alembic upgrade head
+python -m todo_list_api.migrate
 
-poetry run uvicorn --host 0.0.0.0 --port 8000 todo_list_api.app:app
\ No newline at end of file
+exec gunicorn todo_list_api.app:app
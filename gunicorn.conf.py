@@ -0,0 +1,27 @@
+import os
+from tempfile import mkdtemp
+
+if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+    os.environ['PROMETHEUS_MULTIPROC_DIR'] = mkdtemp(prefix='prometheus-')
+
+from todo_list_api.settings import Settings  # noqa: E402
+
+settings = Settings()
+workers = settings.SERVER_WORKERS or os.cpu_count() or 1
+
+if 'HASHING_WORKERS' not in settings.model_fields_set:
+    os.environ['HASHING_WORKERS'] = str(
+        max(1, (os.cpu_count() or 1) // workers)
+    )
+
+from todo_list_api import server  # noqa: E402
+
+bind = '0.0.0.0:8000'
+worker_class = 'uvicorn_worker.UvicornWorker'
+max_requests = settings.SERVER_MAX_REQUESTS
+max_requests_jitter = settings.SERVER_MAX_REQUESTS_JITTER
+preload_app = True
+
+when_ready = server.when_ready
+post_fork = server.post_fork
+child_exit = server.child_exit
@@ -0,0 +1,40 @@
+"""add todos filter indexes
+
+Revision ID: 0b170a3d7a4b
+Revises: d16a7df36fde
+Create Date: 2026-10-18 10:03:27.718452
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b170a3d7a4b'
+down_revision: Union[str, None] = 'd16a7df36fde'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    with op.get_context().autocommit_block():
+        op.create_index('ix_todos_user_id_id', 'todos', ['user_id', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_todos_user_id_state_id', 'todos', ['user_id', 'TodoState.draft', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_todos_user_id_updated_at_id', 'todos', ['user_id', 'updated_at', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_todos_title_trgm', 'todos', ['title'], unique=False, postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'}, postgresql_concurrently=True)
+        op.create_index('ix_todos_description_trgm', 'todos', ['description'], unique=False, postgresql_using='gin', postgresql_ops={'description': 'gin_trgm_ops'}, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_todos_description_trgm', table_name='todos', postgresql_concurrently=True)
+        op.drop_index('ix_todos_title_trgm', table_name='todos', postgresql_concurrently=True)
+        op.drop_index('ix_todos_user_id_updated_at_id', table_name='todos', postgresql_concurrently=True)
+        op.drop_index('ix_todos_user_id_state_id', table_name='todos', postgresql_concurrently=True)
+        op.drop_index('ix_todos_user_id_id', table_name='todos', postgresql_concurrently=True)
@@ -0,0 +1,135 @@
+"""cap todo delete notifications
+
+Revision ID: 1d7f3b9e6c42
+Revises: f4a9c2e7b815
+Create Date: 2026-10-20 10:22:14.908311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1d7f3b9e6c42'
+down_revision: Union[str, None] = 'f4a9c2e7b815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+    CREATE OR REPLACE FUNCTION notify_todo_events() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    DECLARE
+        deleted integer;
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            SELECT count(*) INTO deleted FROM old_rows
+            WHERE NOT EXISTS (
+                SELECT FROM todos_archive WHERE todos_archive.id = old_rows.id
+            );
+
+            IF deleted > 500 THEN
+                PERFORM pg_notify(
+                    'todo_events',
+                    json_build_object('user_id', user_id, 'op', 'reset')::text
+                )
+                FROM old_rows
+                WHERE NOT EXISTS (
+                    SELECT FROM todos_archive
+                    WHERE todos_archive.id = old_rows.id
+                )
+                GROUP BY user_id;
+            ELSE
+                PERFORM pg_notify(
+                    'todo_events',
+                    json_build_object(
+                        'user_id', user_id, 'op', 'deleted', 'id', id
+                    )::text
+                )
+                FROM old_rows
+                WHERE NOT EXISTS (
+                    SELECT FROM todos_archive
+                    WHERE todos_archive.id = old_rows.id
+                );
+            END IF;
+        ELSIF (SELECT count(*) FROM new_rows) > 500 THEN
+            PERFORM pg_notify(
+                'todo_events',
+                json_build_object('user_id', user_id, 'op', 'reset')::text
+            )
+            FROM (SELECT DISTINCT user_id FROM new_rows) AS owners;
+        ELSE
+            PERFORM pg_notify(
+                'todo_events',
+                json_build_object(
+                    'user_id', user_id,
+                    'op', CASE TG_OP WHEN 'INSERT' THEN 'created'
+                        ELSE 'updated' END,
+                    'todo', json_build_object(
+                        'id', id,
+                        'title', title,
+                        'description', description,
+                        'state', "TodoState.draft",
+                        'created_at', created_at,
+                        'updated_at', updated_at
+                    )
+                )::text
+            )
+            FROM new_rows;
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("""
+    CREATE OR REPLACE FUNCTION notify_todo_events() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            PERFORM pg_notify(
+                'todo_events',
+                json_build_object(
+                    'user_id', user_id, 'op', 'deleted', 'id', id
+                )::text
+            )
+            FROM old_rows
+            WHERE NOT EXISTS (
+                SELECT FROM todos_archive WHERE todos_archive.id = old_rows.id
+            );
+        ELSIF (SELECT count(*) FROM new_rows) > 500 THEN
+            PERFORM pg_notify(
+                'todo_events',
+                json_build_object('user_id', user_id, 'op', 'reset')::text
+            )
+            FROM (SELECT DISTINCT user_id FROM new_rows) AS owners;
+        ELSE
+            PERFORM pg_notify(
+                'todo_events',
+                json_build_object(
+                    'user_id', user_id,
+                    'op', CASE TG_OP WHEN 'INSERT' THEN 'created'
+                        ELSE 'updated' END,
+                    'todo', json_build_object(
+                        'id', id,
+                        'title', title,
+                        'description', description,
+                        'state', "TodoState.draft",
+                        'created_at', created_at,
+                        'updated_at', updated_at
+                    )
+                )::text
+            )
+            FROM new_rows;
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """)
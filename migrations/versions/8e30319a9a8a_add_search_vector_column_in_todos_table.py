@@ -0,0 +1,35 @@
+"""add search_vector column in todos table
+
+Revision ID: 8e30319a9a8a
+Revises: 0b170a3d7a4b
+Create Date: 2026-10-18 11:21:54.093217
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e30319a9a8a'
+down_revision: Union[str, None] = '0b170a3d7a4b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('todos', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed("setweight(to_tsvector('english', title), 'A') || setweight(to_tsvector('english', coalesce(description, '')), 'B')", persisted=True), nullable=True))
+
+    with op.get_context().autocommit_block():
+        op.create_index('ix_todos_search_vector', 'todos', ['search_vector'], unique=False, postgresql_using='gin', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_todos_search_vector', table_name='todos', postgresql_concurrently=True)
+
+    op.drop_column('todos', 'search_vector')
@@ -0,0 +1,50 @@
+"""create todos_archive table
+
+Revision ID: 9a41d7c3e6f2
+Revises: 5c2f81d9a0b7
+Create Date: 2026-10-18 22:02:47.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a41d7c3e6f2'
+down_revision: Union[str, None] = '5c2f81d9a0b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('todos_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('title', sa.String(), nullable=False),
+    sa.Column('description', sa.String(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('state', postgresql.ENUM(name='todostate', create_type=False), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_todos_archive_user_id_id', 'todos_archive', ['user_id', 'id'], unique=False)
+    op.create_index('ix_todos_archive_trash_updated_at', 'todos_archive', ['updated_at'], unique=False, postgresql_where=sa.text("state = 'trash'"))
+
+    with op.get_context().autocommit_block():
+        op.create_index('ix_todos_archivable_updated_at', 'todos', ['updated_at'], unique=False, postgresql_where=sa.text('"TodoState.draft" IN (\'done\', \'trash\')'), postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_todos_archivable_updated_at', table_name='todos', postgresql_concurrently=True)
+
+    op.drop_index('ix_todos_archive_trash_updated_at', table_name='todos_archive')
+    op.drop_index('ix_todos_archive_user_id_id', table_name='todos_archive')
+    op.drop_table('todos_archive')
@@ -0,0 +1,84 @@
+"""notify todo events from triggers
+
+Revision ID: c7e3a15b90d4
+Revises: 9a41d7c3e6f2
+Create Date: 2026-10-19 09:12:31.604118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e3a15b90d4'
+down_revision: Union[str, None] = '9a41d7c3e6f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+    CREATE OR REPLACE FUNCTION notify_todo_events() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            PERFORM pg_notify(
+                'todo_events',
+                json_build_object(
+                    'user_id', user_id, 'op', 'deleted', 'id', id
+                )::text
+            )
+            FROM old_rows
+            WHERE NOT EXISTS (
+                SELECT FROM todos_archive WHERE todos_archive.id = old_rows.id
+            );
+        ELSIF (SELECT count(*) FROM new_rows) > 500 THEN
+            PERFORM pg_notify(
+                'todo_events',
+                json_build_object('user_id', user_id, 'op', 'reset')::text
+            )
+            FROM (SELECT DISTINCT user_id FROM new_rows) AS owners;
+        ELSE
+            PERFORM pg_notify(
+                'todo_events',
+                json_build_object(
+                    'user_id', user_id,
+                    'op', CASE TG_OP WHEN 'INSERT' THEN 'created'
+                        ELSE 'updated' END,
+                    'todo', json_build_object(
+                        'id', id,
+                        'title', title,
+                        'description', description,
+                        'state', "TodoState.draft",
+                        'created_at', created_at,
+                        'updated_at', updated_at
+                    )
+                )::text
+            )
+            FROM new_rows;
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """)
+    for operation, transition in (
+        ('insert', 'NEW TABLE AS new_rows'),
+        ('update', 'NEW TABLE AS new_rows'),
+        ('delete', 'OLD TABLE AS old_rows'),
+    ):
+        op.execute(
+            f'CREATE TRIGGER todos_notify_{operation} '
+            f'AFTER {operation.upper()} ON todos '
+            f'REFERENCING {transition} '
+            'FOR EACH STATEMENT EXECUTE FUNCTION notify_todo_events()'
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for operation in ('delete', 'update', 'insert'):
+        op.execute(f'DROP TRIGGER todos_notify_{operation} ON todos')
+    op.execute('DROP FUNCTION notify_todo_events()')
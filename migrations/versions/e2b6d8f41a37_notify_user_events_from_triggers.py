@@ -0,0 +1,48 @@
+"""notify user events from triggers
+
+Revision ID: e2b6d8f41a37
+Revises: c7e3a15b90d4
+Create Date: 2026-10-19 14:05:47.219361
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b6d8f41a37'
+down_revision: Union[str, None] = 'c7e3a15b90d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+    CREATE OR REPLACE FUNCTION notify_user_events() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        PERFORM pg_notify(
+            'user_events', json_build_object('user_id', id)::text
+        )
+        FROM changed_rows;
+        RETURN NULL;
+    END
+    $$
+    """)
+    for operation in ('update', 'delete'):
+        op.execute(
+            f'CREATE TRIGGER users_notify_{operation} '
+            f'AFTER {operation.upper()} ON users '
+            'REFERENCING OLD TABLE AS changed_rows '
+            'FOR EACH STATEMENT EXECUTE FUNCTION notify_user_events()'
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for operation in ('update', 'delete'):
+        op.execute(f'DROP TRIGGER users_notify_{operation} ON users')
+    op.execute('DROP FUNCTION notify_user_events()')
@@ -0,0 +1,54 @@
+"""notify todo archive events
+
+Revision ID: f4a9c2e7b815
+Revises: e2b6d8f41a37
+Create Date: 2026-10-19 16:41:08.537920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4a9c2e7b815'
+down_revision: Union[str, None] = 'e2b6d8f41a37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+    CREATE OR REPLACE FUNCTION notify_todo_archive_events() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        PERFORM pg_notify(
+            'todo_archive_events',
+            json_build_object('user_id', user_id)::text
+        )
+        FROM (SELECT DISTINCT user_id FROM changed_rows) AS owners;
+        RETURN NULL;
+    END
+    $$
+    """)
+    for operation, transition in (
+        ('insert', 'NEW TABLE AS changed_rows'),
+        ('delete', 'OLD TABLE AS changed_rows'),
+    ):
+        op.execute(
+            f'CREATE TRIGGER todos_archive_notify_{operation} '
+            f'AFTER {operation.upper()} ON todos_archive '
+            f'REFERENCING {transition} '
+            'FOR EACH STATEMENT EXECUTE FUNCTION notify_todo_archive_events()'
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for operation in ('delete', 'insert'):
+        op.execute(
+            f'DROP TRIGGER todos_archive_notify_{operation} ON todos_archive'
+        )
+    op.execute('DROP FUNCTION notify_todo_archive_events()')
@@ -7,34 +7,93 @@ import pytest
 import pytest_asyncio
 from fastapi.testclient import TestClient
 from sqlalchemy import event
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from testcontainers.postgres import PostgresContainer
 
 from todo_list_api.app import app
-from todo_list_api.database import get_session
+from todo_list_api.app import settings as app_settings
+from todo_list_api.cache import MemoryResponseCache
+from todo_list_api.database import (
+    get_session,
+    get_session_factory,
+    instrument_engine,
+)
+from todo_list_api.events import TodoEventBroker, get_todo_events
 from todo_list_api.models.registry import table_registry
 from todo_list_api.models.todos import Todo, TodoState
 from todo_list_api.models.users import User
-from todo_list_api.security import get_password_hash
+from todo_list_api.querybudget import budget_observers
+from todo_list_api.replicas import get_read_session, get_read_session_factory
+from todo_list_api.routers.todos import get_todo_cache
+from todo_list_api.security import get_password_hash, token_versions
 from todo_list_api.settings import Settings
 
 
 @pytest.fixture
-def client(session):
+def query_budget():
+    violations = []
+
+    def record_violations(route, messages):
+        violations.extend(f'{route}: {message}' for message in messages)
+
+    budget_observers.append(record_violations)
+    yield violations
+    budget_observers.remove(record_violations)
+
+    if violations:
+        pytest.fail('Query budget exceeded:\n' + '\n'.join(violations))
+
+
+@pytest.fixture
+def client(session, query_budget, monkeypatch):
+    monkeypatch.setattr(app_settings, 'CACHE_INVALIDATION', False)
+
     def get_session_overdrive():
         return session
 
+    def get_session_factory_overdrive():
+        return async_sessionmaker(session.bind, expire_on_commit=False)
+
+    todo_cache = MemoryResponseCache(maxsize=100, ttl=60)
+
+    def get_todo_cache_overdrive():
+        return todo_cache
+
+    todo_events = TodoEventBroker(
+        session.bind.url.render_as_string(hide_password=False),
+        queue_size=10,
+    )
+
+    def get_todo_events_overdrive():
+        return todo_events
+
     with TestClient(app) as client:
         app.dependency_overrides[get_session] = get_session_overdrive
+        app.dependency_overrides[get_session_factory] = (
+            get_session_factory_overdrive
+        )
+        app.dependency_overrides[get_todo_cache] = get_todo_cache_overdrive
+        app.dependency_overrides[get_todo_events] = get_todo_events_overdrive
+        app.dependency_overrides[get_read_session] = get_session_overdrive
+        app.dependency_overrides[get_read_session_factory] = (
+            get_session_factory_overdrive
+        )
         yield client
 
         app.dependency_overrides.clear()
+        token_versions.clear()
 
 
 @pytest_asyncio.fixture(scope='session')
 def engine():
     with PostgresContainer('postgres:17', driver='psycopg') as postgres:
-        yield create_async_engine(postgres.get_connection_url())
+        yield instrument_engine(
+            create_async_engine(postgres.get_connection_url())
+        )
 
 
 @pytest_asyncio.fixture
@@ -47,6 +106,7 @@ async def session(engine):
 
     async with engine.begin() as conn:
         await conn.run_sync(table_registry.metadata.drop_all)
+    await engine.dispose()
 
 
 @contextmanager
@@ -82,7 +142,7 @@ class UserFactory(factory.Factory):
 async def user(session: AsyncSession):
     password = 'test1234'
 
-    user = UserFactory(password=get_password_hash(password))
+    user = UserFactory(password=await get_password_hash(password))
     session.add(user)
     await session.commit()
     await session.refresh(user)
@@ -96,7 +156,7 @@ async def user(session: AsyncSession):
 async def other_user(session: AsyncSession):
     password = 'test1234'
 
-    user = UserFactory(password=get_password_hash(password))
+    user = UserFactory(password=await get_password_hash(password))
     session.add(user)
     await session.commit()
     await session.refresh(user)
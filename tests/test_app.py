@@ -1,5 +1,7 @@
 from http import HTTPStatus
 
+from prometheus_client import REGISTRY
+
 
 def test_root_get_should_return_hello_world(client):
     response = client.get('/')
@@ -13,3 +15,27 @@ def test_api_v1_get_should_return_html_hello_world(client):
 
     assert response.text == '<html><body><h1>Hello World!</h1></body></html>'
     assert response.status_code == HTTPStatus.OK
+
+
+def test_metrics_should_report_routes_and_db_statements(client, token):
+    labels = {'route': '/api/v1/todos/'}
+    statements_before = (
+        REGISTRY.get_sample_value('db_statements_per_request_sum', labels) or 0
+    )
+
+    client.get('/api/v1/todos/', headers={'Authorization': f'Bearer {token}'})
+    response = client.get('/metrics')
+
+    assert response.status_code == HTTPStatus.OK
+    assert (
+        'http_requests_total{method="GET",route="/api/v1/todos/",'
+        'status="200"}' in response.text
+    )
+    assert (
+        REGISTRY.get_sample_value('db_statements_per_request_sum', labels)
+        > statements_before
+    )
+    assert REGISTRY.get_sample_value(
+        'password_hash_duration_seconds_count',
+        {'operation': 'check_password'},
+    )
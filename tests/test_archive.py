@@ -0,0 +1,304 @@
+from datetime import datetime, timedelta
+from http import HTTPStatus
+
+import pytest
+from sqlalchemy import select, text, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from todo_list_api.archive import archive_statement, archive_todos
+from todo_list_api.models.todos import (
+    Todo,
+    TodoArchive,
+    TodoState,
+    TodoTombstone,
+)
+from todo_list_api.purge import purge_trash
+
+from .conftest import TodoFactory
+
+
+@pytest.fixture
+def factory(session):
+    return async_sessionmaker(session.bind)
+
+
+async def _add_todos(session, user_id: int, ages: dict):
+    todos = {
+        (state, age): TodoFactory(user_id=user_id, state=state)
+        for state, age in ages
+    }
+    session.add_all(todos.values())
+    await session.flush()
+    for (_, age), todo in todos.items():
+        await session.execute(
+            update(Todo)
+            .where(Todo.id == todo.id)
+            .values(updated_at=datetime.now() - timedelta(days=age))
+        )
+    await session.commit()
+    return todos
+
+
+@pytest.mark.asyncio
+async def test_archive_todos_moves_old_done_and_trash(session, user, factory):
+    todos = await _add_todos(
+        session,
+        user.id,
+        [
+            (TodoState.done, 40),
+            (TodoState.done, 5),
+            (TodoState.trash, 10),
+            (TodoState.trash, 1),
+            (TodoState.todo, 100),
+        ],
+    )
+
+    archived = await archive_todos(
+        factory,
+        done_days=30,
+        trash_days=7,
+        batch_size=1,
+    )
+    active = await session.scalars(select(Todo.id).order_by(Todo.id))
+    archive = await session.scalars(
+        select(TodoArchive.id).order_by(TodoArchive.id)
+    )
+
+    assert archived == {'done': 1, 'trash': 1}
+    assert list(active) == [
+        todos[TodoState.done, 5].id,
+        todos[TodoState.trash, 1].id,
+        todos[TodoState.todo, 100].id,
+    ]
+    assert list(archive) == [
+        todos[TodoState.done, 40].id,
+        todos[TodoState.trash, 10].id,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_purge_trash_deletes_expired_archive_and_leaves_tombstones(
+    session, user, factory
+):
+    todos = await _add_todos(
+        session,
+        user.id,
+        [(TodoState.trash, 45), (TodoState.trash, 10), (TodoState.done, 45)],
+    )
+    await archive_todos(factory, done_days=30, trash_days=7, batch_size=10)
+
+    purged = await purge_trash(factory, retention_days=30, batch_size=10)
+    archive = await session.scalars(
+        select(TodoArchive.id).order_by(TodoArchive.id)
+    )
+    tombstones = await session.scalars(select(TodoTombstone.todo_id))
+
+    assert purged == 1
+    assert list(archive) == [
+        todos[TodoState.trash, 10].id,
+        todos[TodoState.done, 45].id,
+    ]
+    assert list(tombstones) == [todos[TodoState.trash, 45].id]
+
+
+@pytest.mark.asyncio
+async def test_v1_get_read_todos_include_archived(
+    session, client, token, user, factory
+):
+    todos = await _add_todos(
+        session, user.id, [(TodoState.done, 40), (TodoState.todo, 1)]
+    )
+    await archive_todos(
+        factory,
+        done_days=30,
+        trash_days=7,
+        batch_size=10,
+    )
+    headers = {'Authorization': f'Bearer {token}'}
+
+    active = client.get('/api/v1/todos/', headers=headers)
+    everything = client.get(
+        '/api/v1/todos/',
+        headers=headers,
+        params={'include_archived': True, 'order_by': 'updated_at'},
+    )
+    done = client.get(
+        '/api/v1/todos/',
+        headers=headers,
+        params={'include_archived': True, 'state': 'done'},
+    )
+
+    assert active.status_code == HTTPStatus.OK
+    assert [todo['id'] for todo in active.json()['todos']] == [
+        todos[TodoState.todo, 1].id
+    ]
+    assert [todo['id'] for todo in everything.json()['todos']] == [
+        todos[TodoState.done, 40].id,
+        todos[TodoState.todo, 1].id,
+    ]
+    assert done.json()['todos'][0]['state'] == 'done'
+    assert len(done.json()['todos']) == 1
+
+
+@pytest.mark.asyncio
+async def test_v1_patch_restores_archived_todo(
+    session, client, token, user, factory
+):
+    todos = await _add_todos(session, user.id, [(TodoState.trash, 10)])
+    trashed = todos[TodoState.trash, 10]
+    await archive_todos(factory, done_days=30, trash_days=7, batch_size=10)
+
+    response = client.patch(
+        f'/api/v1/todos/{trashed.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'state': 'todo'},
+    )
+    active = await session.scalars(select(Todo.id))
+    archive = await session.scalars(select(TodoArchive.id))
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['id'] == trashed.id
+    assert response.json()['title'] == trashed.title
+    assert response.json()['state'] == 'todo'
+    assert list(active) == [trashed.id]
+    assert list(archive) == []
+
+
+@pytest.mark.asyncio
+async def test_v1_delete_removes_archived_todo(
+    session, client, token, user, factory
+):
+    todos = await _add_todos(session, user.id, [(TodoState.done, 40)])
+    done = todos[TodoState.done, 40]
+    await archive_todos(factory, done_days=30, trash_days=7, batch_size=10)
+
+    response = client.delete(
+        f'/api/v1/todos/{done.id}',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    archive = await session.scalars(select(TodoArchive.id))
+    tombstones = await session.scalars(select(TodoTombstone.todo_id))
+
+    assert response.status_code == HTTPStatus.NO_CONTENT
+    assert list(archive) == []
+    assert list(tombstones) == [done.id]
+
+
+@pytest.mark.asyncio
+async def test_v1_empty_patch_reads_archived_todo(
+    session, client, token, user, factory
+):
+    todos = await _add_todos(session, user.id, [(TodoState.done, 40)])
+    done = todos[TodoState.done, 40]
+    await archive_todos(factory, done_days=30, trash_days=7, batch_size=10)
+
+    response = client.patch(
+        f'/api/v1/todos/{done.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={},
+    )
+    archive = await session.scalars(select(TodoArchive.id))
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['id'] == done.id
+    assert response.json()['state'] == 'done'
+    assert list(archive) == [done.id]
+
+
+@pytest.mark.asyncio
+async def test_v1_bulk_restores_and_deletes_archived_todos(
+    session, client, token, user, factory
+):
+    todos = await _add_todos(
+        session,
+        user.id,
+        [(TodoState.trash, 10), (TodoState.done, 40), (TodoState.todo, 1)],
+    )
+    trashed = todos[TodoState.trash, 10]
+    done = todos[TodoState.done, 40]
+    active = todos[TodoState.todo, 1]
+    await archive_todos(factory, done_days=30, trash_days=7, batch_size=10)
+
+    response = client.post(
+        '/api/v1/todos/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json={
+            'operations': [
+                {'op': 'update', 'id': trashed.id, 'state': 'todo'},
+                {'op': 'update', 'id': active.id, 'state': 'doing'},
+                {'op': 'delete', 'id': done.id},
+            ]
+        },
+    )
+    results = response.json()['results']
+    remaining = await session.scalars(select(Todo.id).order_by(Todo.id))
+    archive = await session.scalars(select(TodoArchive.id))
+    tombstones = await session.scalars(select(TodoTombstone.todo_id))
+
+    assert response.status_code == HTTPStatus.OK
+    assert [result['status'] for result in results] == [
+        HTTPStatus.OK,
+        HTTPStatus.OK,
+        HTTPStatus.NO_CONTENT,
+    ]
+    assert results[0]['todo']['state'] == 'todo'
+    assert results[1]['todo']['state'] == 'doing'
+    assert list(remaining) == sorted([trashed.id, active.id])
+    assert list(archive) == []
+    assert list(tombstones) == [done.id]
+
+
+@pytest.mark.asyncio
+async def test_v1_patch_archived_todo_of_other_user_is_not_found(
+    session, client, token, other_user, factory
+):
+    todos = await _add_todos(session, other_user.id, [(TodoState.done, 40)])
+    await archive_todos(factory, done_days=30, trash_days=7, batch_size=10)
+
+    response = client.patch(
+        f'/api/v1/todos/{todos[TodoState.done, 40].id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'state': 'todo'},
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_v1_get_export_todos_include_archived(
+    session, client, token, user, factory
+):
+    expected_lines = 2
+    await _add_todos(
+        session, user.id, [(TodoState.done, 40), (TodoState.todo, 1)]
+    )
+    await archive_todos(
+        factory,
+        done_days=30,
+        trash_days=7,
+        batch_size=10,
+    )
+
+    response = client.get(
+        '/api/v1/todos/export',
+        headers={'Authorization': f'Bearer {token}'},
+        params={'include_archived': True},
+    )
+
+    assert len(response.text.splitlines()) == expected_lines
+
+
+@pytest.mark.asyncio
+async def test_archive_candidates_are_served_by_partial_index(session):
+    await session.execute(text('SET LOCAL enable_seqscan = off'))
+
+    query = archive_statement(TodoState.done, 30, 1000)
+    compiled = query.compile(dialect=session.bind.dialect)
+    connection = await session.connection()
+    result = await connection.exec_driver_sql(
+        f'EXPLAIN {compiled}', compiled.params
+    )
+    plan = '\n'.join(result.scalars())
+    await session.rollback()
+
+    assert 'ix_todos_archivable_updated_at' in plan
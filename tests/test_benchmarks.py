@@ -0,0 +1,41 @@
+from benchmarks.load import compare, parse_mix, percentile, summarize
+
+
+def test_summarize_should_report_rps_and_percentiles():
+    expected_rps = 50
+    samples = [index / 1000 for index in range(1, 101)]
+
+    summary = summarize(samples, errors=0, seconds=2)
+
+    assert summary['rps'] == expected_rps
+    assert summary['p50_ms'] == round(percentile(samples, 50) * 1000, 3)
+    assert summary['p50_ms'] < summary['p95_ms'] < summary['p99_ms']
+
+
+def test_compare_should_flag_regressions_beyond_tolerance():
+    endpoint = {
+        'requests': 100,
+        'errors': 0,
+        'rps': 100,
+        'p50_ms': 10,
+        'p95_ms': 20,
+        'p99_ms': 30,
+    }
+    baseline = {'endpoints': {'list': endpoint, 'login': endpoint}}
+    report = {
+        'endpoints': {
+            'list': {**endpoint, 'rps': 95, 'p95_ms': 21},
+            'login': {**endpoint, 'rps': 80, 'p99_ms': 40},
+        }
+    }
+
+    regressions = compare(report, baseline, tolerance=0.1)
+
+    assert regressions == [
+        'login: 80 rps is below the baseline of 100 rps',
+        'login: p99_ms 40 is above the baseline of 30',
+    ]
+
+
+def test_parse_mix_should_read_weights():
+    assert parse_mix('list=3,create=1') == {'list': 3, 'create': 1}
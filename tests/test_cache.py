@@ -0,0 +1,22 @@
+import pytest
+
+from todo_list_api.cache import MemoryResponseCache, ResponseCache
+
+
+def test_response_cache_rejects_incomplete_backends():
+    class GetOnlyCache(ResponseCache):
+        async def get(self, key: str): ...
+
+    with pytest.raises(TypeError, match='abstract'):
+        GetOnlyCache()
+
+
+@pytest.mark.asyncio
+async def test_memory_response_cache_implements_the_interface():
+    cache = MemoryResponseCache(maxsize=10, ttl=30)
+
+    await cache.set('key', b'value')
+    await cache.bump('namespace')
+
+    assert await cache.get('key') == b'value'
+    assert await cache.generation('namespace') == 1
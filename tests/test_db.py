@@ -2,10 +2,17 @@ import contextlib
 from dataclasses import asdict
 
 import pytest
-from sqlalchemy import select
+from sqlalchemy import select, text
+from sqlalchemy.exc import InvalidRequestError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
-from todo_list_api.database import get_session
+from todo_list_api.database import (
+    InstrumentedPool,
+    create_engine_from_settings,
+    get_session,
+)
+from todo_list_api.models.todos import Todo
 from todo_list_api.models.users import User
 
 
@@ -18,7 +25,9 @@ async def test_should_create_user_in_db(session: AsyncSession, mock_db_time):
         session.add(new_user)
         await session.commit()
 
-        user = await session.scalar(select(User).where(User.id == 1))
+        user = await session.scalar(
+            select(User).where(User.id == 1).options(selectinload(User.todos))
+        )
 
         assert user.username == 'test_name'
         assert user.email == 'test@email.com'
@@ -28,12 +37,22 @@ async def test_should_create_user_in_db(session: AsyncSession, mock_db_time):
             'username': 'test_name',
             'email': 'test@email.com',
             'password': 'test1234',
+            'token_version': 0,
             'created_at': time,
             'updated_at': time,
+            'deleted_at': None,
             'todos': [],
         }
 
 
+@pytest.mark.asyncio
+async def test_user_todos_should_not_lazy_load(session: AsyncSession, user):
+    db_user = await session.scalar(select(User).where(User.id == user.id))
+
+    with pytest.raises(InvalidRequestError):
+        db_user.todos  # noqa: B018
+
+
 @pytest.mark.asyncio
 async def test_get_session_yields_async_session():
     session = get_session()
@@ -45,3 +64,55 @@ async def test_get_session_yields_async_session():
     finally:
         with contextlib.suppress(StopAsyncIteration):
             await anext(session)
+
+
+@pytest.mark.asyncio
+async def test_todo_loaded_from_db_converts_to_dict(
+    session: AsyncSession, user
+):
+    session.add(Todo(title='task', description='test', user_id=user.id))
+    await session.commit()
+    session.expunge_all()
+
+    todo = await session.scalar(select(Todo))
+
+    assert set(asdict(todo)) == {
+        'id',
+        'title',
+        'description',
+        'user_id',
+        'state',
+        'created_at',
+        'updated_at',
+    }
+
+
+@pytest.mark.asyncio
+async def test_engine_from_settings_applies_pool_settings(session, settings):
+    expected_pool_size = 2
+    engine = create_engine_from_settings(
+        settings.model_copy(
+            update={
+                'DATABASE_URL': session.bind.url.render_as_string(
+                    hide_password=False
+                ),
+                'DATABASE_POOL_SIZE': expected_pool_size,
+                'DATABASE_STATEMENT_TIMEOUT': 1500,
+            }
+        )
+    )
+
+    try:
+        async with engine.connect() as conn:
+            statement_timeout = await conn.scalar(
+                text('SHOW statement_timeout')
+            )
+            stats = engine.pool.stats()
+    finally:
+        await engine.dispose()
+
+    assert isinstance(engine.pool, InstrumentedPool)
+    assert statement_timeout == '1500ms'
+    assert stats['size'] == expected_pool_size
+    assert stats['checked_out'] == 1
+    assert stats['wait_time']['count'] == 1
@@ -0,0 +1,162 @@
+import asyncio
+
+import psycopg
+import pytest
+from sqlalchemy import delete, insert, update
+
+from todo_list_api.archive import archive_statement
+from todo_list_api.events import RESET, Subscription, TodoEventBroker
+from todo_list_api.models.todos import (
+    TODO_EVENTS_RESET_ROWS,
+    Todo,
+    TodoState,
+)
+
+from .conftest import TodoFactory
+
+
+@pytest.fixture
+def broker(engine):
+    return TodoEventBroker(
+        engine.url.render_as_string(hide_password=False), queue_size=10
+    )
+
+
+async def _next_events(subscription, count: int):
+    return [
+        await asyncio.wait_for(subscription.get(), timeout=5)
+        for _ in range(count)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_todo_writes_should_notify_only_the_owner_subscriptions(
+    session, broker, user, other_user
+):
+    owned = TodoFactory(user_id=user.id, title='owned')
+    async with broker.subscribe(user.id) as subscription:
+        session.add_all([owned, TodoFactory(user_id=other_user.id)])
+        await session.commit()
+        await session.execute(
+            update(Todo).where(Todo.id == owned.id).values(title='renamed')
+        )
+        await session.execute(delete(Todo).where(Todo.id == owned.id))
+        await session.commit()
+
+        created, updated, deleted = await _next_events(subscription, 3)
+
+    assert created['op'] == 'created'
+    assert created['todo']['id'] == owned.id
+    assert created['todo']['title'] == 'owned'
+    assert created['todo']['state'] == owned.state
+    assert updated['op'] == 'updated'
+    assert updated['todo']['title'] == 'renamed'
+    assert deleted == {'op': 'deleted', 'id': owned.id}
+    assert subscription.queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_large_writes_should_notify_a_single_reset(
+    session, broker, user
+):
+    async with broker.subscribe(user.id) as subscription:
+        await session.execute(
+            insert(Todo),
+            [
+                {'user_id': user.id, 'title': 'bulk', 'description': ''}
+                for _ in range(TODO_EVENTS_RESET_ROWS + 1)
+            ],
+        )
+        await session.commit()
+
+        events = await _next_events(subscription, 1)
+
+    assert events == [RESET]
+    assert subscription.queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_large_deletes_should_notify_a_reset_per_owner(
+    session, engine, user, other_user
+):
+    broker = TodoEventBroker(
+        engine.url.render_as_string(hide_password=False),
+        queue_size=TODO_EVENTS_RESET_ROWS * 2,
+    )
+    await session.execute(
+        insert(Todo),
+        [
+            {'user_id': owner.id, 'title': 'bulk', 'description': ''}
+            for owner in (user, other_user)
+            for _ in range(TODO_EVENTS_RESET_ROWS)
+        ],
+    )
+    await session.commit()
+
+    async with (
+        broker.subscribe(user.id) as subscription,
+        broker.subscribe(other_user.id) as other_subscription,
+    ):
+        await session.execute(delete(Todo))
+        await session.commit()
+
+        events = await _next_events(subscription, 1)
+        other_events = await _next_events(other_subscription, 1)
+
+    assert events == other_events == [RESET]
+    assert subscription.queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_archiving_should_not_notify_deletions(session, broker, user):
+    archived, deleted = TodoFactory.create_batch(
+        2, user_id=user.id, state=TodoState.done
+    )
+    session.add_all([archived, deleted])
+    await session.commit()
+
+    async with broker.subscribe(user.id) as subscription:
+        await session.execute(archive_statement(TodoState.done, -1, 1))
+        await session.execute(delete(Todo).where(Todo.id == deleted.id))
+        await session.commit()
+
+        events = await _next_events(subscription, 1)
+
+    assert events == [{'op': 'deleted', 'id': deleted.id}]
+
+
+@pytest.mark.asyncio
+async def test_broker_should_share_one_listener_until_the_last_leaves(broker):
+    async with broker.subscribe(1):
+        listener = broker._listener
+        async with broker.subscribe(2):
+            assert broker._listener is listener
+        assert broker._listener is listener
+
+    assert broker._listener is None
+    assert not broker.subscribers
+
+
+@pytest.mark.asyncio
+async def test_subscribe_should_fail_when_database_is_unreachable():
+    broker = TodoEventBroker(
+        'postgresql+psycopg://nobody@127.0.0.1:1/nothing', queue_size=10
+    )
+
+    with pytest.raises(psycopg.OperationalError):
+        async with broker.subscribe(1):
+            pass
+
+    assert broker._listener is None
+    assert not broker.subscribers
+
+
+@pytest.mark.asyncio
+async def test_subscription_should_reset_instead_of_blocking_when_full():
+    subscription = Subscription(queue_size=1)
+
+    subscription.put({'op': 'deleted', 'id': 1})
+    subscription.put({'op': 'deleted', 'id': 2})
+
+    assert await subscription.get() == RESET
+    assert subscription.queue.empty()
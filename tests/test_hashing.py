@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+
+from todo_list_api.hashing import (
+    HashingExecutor,
+    HashingQueueFullError,
+    check_password,
+    hash_password,
+)
+
+
+@pytest.mark.asyncio
+async def test_hashing_executor_hash_and_verify():
+    executor = HashingExecutor(kind='thread', workers=1)
+
+    hashed = await executor.run(hash_password, 'secret123')
+
+    assert await executor.run(check_password, 'secret123', hashed)
+    assert not await executor.run(check_password, 'wrong', hashed)
+    assert executor.in_flight == 0
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_hashing_executor_rejects_when_queue_is_full():
+    executor = HashingExecutor(kind='thread', workers=1, queue_size=0)
+
+    first = asyncio.create_task(executor.run(hash_password, 'secret123'))
+    await asyncio.sleep(0)
+
+    with pytest.raises(HashingQueueFullError):
+        await executor.run(hash_password, 'secret123')
+
+    await first
+    assert executor.in_flight == 0
+    executor.shutdown()
+
+
+def test_hashing_executor_stats():
+    expected_max_pending = 5
+    executor = HashingExecutor(kind='thread', workers=2, queue_size=3)
+
+    stats = executor.stats()
+
+    assert stats['kind'] == 'thread'
+    assert stats['max_pending'] == expected_max_pending
+    assert stats['queue_depth'] == 0
+    assert stats['in_flight'] == 0
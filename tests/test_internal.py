@@ -0,0 +1,49 @@
+from http import HTTPStatus
+
+import pytest
+
+from todo_list_api.routers import internal
+
+INTERNAL_TOKEN = 'internal-secret'
+
+
+@pytest.fixture
+def internal_headers(monkeypatch):
+    monkeypatch.setattr(internal.settings, 'INTERNAL_TOKEN', INTERNAL_TOKEN)
+    return {'Authorization': f'Bearer {INTERNAL_TOKEN}'}
+
+
+def test_internal_get_hashing_stats(client, internal_headers):
+    response = client.get('/internal/hashing', headers=internal_headers)
+
+    assert response.status_code == HTTPStatus.OK
+    assert {'kind', 'workers', 'in_flight', 'queue_depth'} <= set(
+        response.json()
+    )
+
+
+def test_internal_get_pool_stats(client, internal_headers):
+    response = client.get('/internal/pool', headers=internal_headers)
+
+    assert response.status_code == HTTPStatus.OK
+    assert {'size', 'checked_out', 'overflow', 'waiting', 'wait_time'} <= set(
+        response.json()
+    )
+
+
+@pytest.mark.parametrize('path', ['/internal/hashing', '/internal/pool'])
+def test_internal_should_be_hidden_without_a_token(client, path):
+    response = client.get(path)
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.parametrize(
+    'headers', [{}, {'Authorization': 'Bearer wrong-secret'}]
+)
+def test_internal_should_reject_wrong_credentials(
+    client, internal_headers, headers
+):
+    response = client.get('/internal/pool', headers=headers)
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
@@ -0,0 +1,154 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from todo_list_api.archive import archive_todos
+from todo_list_api.cache import MemoryResponseCache
+from todo_list_api.invalidation import CacheInvalidator
+from todo_list_api.models.todos import Todo, TodoState
+from todo_list_api.models.users import User
+from todo_list_api.replicas import ReplicaRouter
+from todo_list_api.security import token_versions
+from todo_list_api.settings import Settings
+
+from .conftest import TodoFactory
+
+UNREACHABLE_URL = 'postgresql+psycopg://postgres@127.0.0.1:1/postgres'
+
+
+@pytest_asyncio.fixture
+async def invalidator(engine, session):
+    invalidator = CacheInvalidator(
+        engine.url.render_as_string(hide_password=False),
+        MemoryResponseCache(maxsize=10, ttl=30),
+        ReplicaRouter(
+            session.bind,
+            [create_async_engine(UNREACHABLE_URL)],
+            eject_seconds=30,
+            sticky_seconds=5,
+        ),
+    )
+    yield invalidator
+    await invalidator.stop()
+    token_versions.clear()
+
+
+async def _eventually(predicate):
+    async with asyncio.timeout(5):
+        while not await predicate():
+            await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_cache_invalidator_should_apply_writes_from_other_workers(
+    session, invalidator, user, other_user
+):
+    invalidator.start()
+    await asyncio.wait_for(invalidator.listening.wait(), timeout=5)
+    token_versions.set(user.id, 0)
+    token_versions.set(other_user.id, 0)
+    generation = await invalidator.todos.generation(other_user.id)
+
+    session.add(TodoFactory(user_id=other_user.id))
+    await session.execute(
+        update(User).where(User.id == user.id).values(token_version=1)
+    )
+    await session.commit()
+
+    async def invalidated():
+        return (
+            await invalidator.todos.generation(other_user.id) == generation + 1
+            and token_versions.get(user.id) is None
+        )
+
+    await _eventually(invalidated)
+    assert token_versions.get(other_user.id) == 0
+
+
+@pytest.mark.asyncio
+async def test_cache_invalidator_should_apply_archiving(
+    session, invalidator, user
+):
+    session.add(TodoFactory(user_id=user.id, state=TodoState.done))
+    await session.flush()
+    await session.execute(
+        update(Todo).values(updated_at=func.now() - timedelta(days=40))
+    )
+    await session.commit()
+    invalidator.start()
+    await asyncio.wait_for(invalidator.listening.wait(), timeout=5)
+    generation = await invalidator.todos.generation(user.id)
+
+    await archive_todos(
+        async_sessionmaker(session.bind),
+        done_days=30,
+        trash_days=7,
+        batch_size=10,
+    )
+
+    async def invalidated():
+        return await invalidator.todos.generation(user.id) == generation + 1
+
+    await _eventually(invalidated)
+
+
+@pytest.mark.asyncio
+async def test_cache_invalidator_should_stick_invalidated_users(
+    invalidator, user
+):
+    await invalidator.invalidate('todo_events', f'{{"user_id": {user.id}}}')
+
+    assert await invalidator.todos.generation(user.id) == 1
+    assert invalidator.router.pick(user.id) is invalidator.router.primary
+    assert invalidator.router.pick() is invalidator.router.replicas[0]
+
+
+@pytest.mark.asyncio
+async def test_cache_invalidator_should_reset_caches_on_connect(
+    invalidator, user
+):
+    await invalidator.todos.bump(user.id)
+    generation = await invalidator.todos.generation(user.id)
+    await invalidator.todos.set(f'todos:{user.id}:{generation}', b'[]')
+    token_versions.set(user.id, 0)
+
+    invalidator.start()
+    await asyncio.wait_for(invalidator.listening.wait(), timeout=5)
+
+    assert await invalidator.todos.generation(user.id) > generation
+    assert await invalidator.todos.get(f'todos:{user.id}:{generation}') is None
+    assert token_versions.get(user.id) is None
+    assert invalidator.router.pick() is invalidator.router.primary
+
+
+@pytest.mark.asyncio
+async def test_cache_reset_should_never_reuse_a_generation():
+    expected_bumps = 3
+    cache = MemoryResponseCache(maxsize=10, ttl=30)
+    await cache.bump(1)
+    in_flight = await cache.generation(1)
+
+    await cache.clear()
+    await cache.set(f'todos:1:{in_flight}', b'stale')
+    generations = [await cache.generation(1)]
+    for _ in range(expected_bumps):
+        await cache.bump(1)
+        generations.append(await cache.generation(1))
+
+    assert in_flight not in generations
+    assert generations == sorted(set(generations))
+
+
+def test_cache_invalidation_defaults_on_with_process_caches():
+    assert Settings().CACHE_INVALIDATION is True
+    assert (
+        Settings(
+            TODO_CACHE_SECONDS=0, TOKEN_VERSION_CACHE_SECONDS=0
+        ).CACHE_INVALIDATION
+        is False
+    )
+    assert Settings(CACHE_INVALIDATION=False).CACHE_INVALIDATION is False
@@ -0,0 +1,75 @@
+from http import HTTPStatus
+
+import pytest
+from sqlalchemy import select
+
+from todo_list_api import querybudget
+from todo_list_api.models.users import User
+from todo_list_api.querybudget import (
+    QueryBudget,
+    QueryBudgetExceededError,
+    expect_queries,
+    statement_shape,
+)
+from todo_list_api.routers.todos import read_todos
+
+
+def test_statement_shape_ignores_parameters_and_spacing():
+    assert statement_shape(
+        'SELECT users.id\n  FROM users WHERE users.id = %(id_1)s LIMIT 10'
+    ) == statement_shape(
+        'SELECT users.id FROM users WHERE users.id = $1 LIMIT 5'
+    )
+
+
+async def _load_users(session, user_ids):
+    for user_id in user_ids:
+        await session.execute(select(User).where(User.id == user_id))
+
+
+@pytest.mark.asyncio
+async def test_expect_queries_fails_over_budget(session):
+    expected_queries = 2
+
+    with (
+        pytest.raises(QueryBudgetExceededError, match='budget of 1'),
+        expect_queries(1) as log,
+    ):
+        await _load_users(session, range(expected_queries))
+
+    assert log.count == expected_queries
+
+
+@pytest.mark.asyncio
+async def test_expect_queries_detects_repeated_statements(session, user):
+    with (
+        pytest.raises(QueryBudgetExceededError, match='3 repeats'),
+        expect_queries(None, max_repeats=2),
+    ):
+        await _load_users(session, range(3))
+
+
+def test_route_budget_violations_are_reported(
+    client, token, query_budget, monkeypatch
+):
+    monkeypatch.setattr(read_todos, 'query_budget', QueryBudget(0))
+
+    client.get('/api/v1/todos/', headers={'Authorization': f'Bearer {token}'})
+    violations = list(query_budget)
+    query_budget.clear()
+
+    assert violations == [
+        '/api/v1/todos/: 2 queries exceed the budget of 0',
+    ]
+
+
+def test_debug_mode_reports_queries_in_headers(client, token, monkeypatch):
+    monkeypatch.setattr(querybudget.settings, 'DEBUG', True)
+
+    response = client.get(
+        '/api/v1/todos/', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['X-DB-Queries'] == '2'
+    assert float(response.headers['X-DB-Time']) > 0
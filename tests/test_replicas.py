@@ -0,0 +1,118 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from todo_list_api.replicas import ReplicaRouter
+from todo_list_api.settings import Settings
+
+UNREACHABLE_URL = 'postgresql+psycopg://postgres@127.0.0.1:1/postgres'
+
+
+def test_replica_router_round_robins_replicas(session):
+    replicas = [create_async_engine(UNREACHABLE_URL) for _ in range(2)]
+    router = ReplicaRouter(
+        session.bind, replicas, eject_seconds=30, sticky_seconds=5
+    )
+
+    picked = [router.pick() for _ in range(4)]
+
+    assert picked == [*router.replicas, *router.replicas]
+
+
+def test_replica_router_skips_ejected_replicas(session):
+    replicas = [create_async_engine(UNREACHABLE_URL) for _ in range(2)]
+    router = ReplicaRouter(
+        session.bind, replicas, eject_seconds=30, sticky_seconds=5
+    )
+
+    router.eject(router.replicas[0])
+    picked = {router.pick() for _ in range(4)}
+    router.eject(router.replicas[1])
+
+    assert picked == {router.replicas[1]}
+    assert router.pick() is router.primary
+
+
+def test_replica_router_sticks_writers_to_primary(session):
+    router = ReplicaRouter(
+        session.bind,
+        [create_async_engine(UNREACHABLE_URL)],
+        eject_seconds=30,
+        sticky_seconds=5,
+    )
+
+    router.stick(1)
+
+    assert router.pick(1) is router.primary
+    assert router.pick(2) is router.replicas[0]
+
+
+def test_replica_router_sticks_everyone_after_missed_writes(session):
+    router = ReplicaRouter(
+        session.bind,
+        [create_async_engine(UNREACHABLE_URL)],
+        eject_seconds=30,
+        sticky_seconds=5,
+    )
+
+    router.stick_all()
+
+    assert router.pick(1) is router.primary
+    assert router.pick() is router.primary
+
+
+@pytest.mark.asyncio
+async def test_replica_router_falls_back_to_primary(session):
+    router = ReplicaRouter(
+        session.bind,
+        [create_async_engine(UNREACHABLE_URL)],
+        eject_seconds=30,
+        sticky_seconds=5,
+    )
+
+    async with await router.open_session() as read_session:
+        answer = await read_session.scalar(text('SELECT 1'))
+
+    assert answer == 1
+    assert router.pick() is router.primary
+
+
+@pytest.mark.asyncio
+async def test_replica_router_health_checks_session_factories(session):
+    router = ReplicaRouter(
+        session.bind,
+        [create_async_engine(UNREACHABLE_URL)],
+        eject_seconds=30,
+        sticky_seconds=5,
+    )
+
+    target = await router.pick_healthy()
+    async with async_sessionmaker(target)() as read_session:
+        answer = await read_session.scalar(text('SELECT 1'))
+
+    assert target is router.primary
+    assert answer == 1
+    assert router.pick() is router.primary
+
+
+@pytest.mark.asyncio
+async def test_replica_router_opens_read_only_transactions(session):
+    router = ReplicaRouter(
+        session.bind, [], eject_seconds=30, sticky_seconds=5
+    )
+
+    async with await router.open_session() as read_session:
+        with pytest.raises(DBAPIError, match='read-only transaction'):
+            await read_session.execute(text('CREATE TABLE ro (id int)'))
+
+
+def test_settings_split_replica_urls(monkeypatch):
+    monkeypatch.setenv(
+        'DATABASE_REPLICA_URLS', 'postgresql://a/db, postgresql://b/db'
+    )
+
+    assert Settings().DATABASE_REPLICA_URLS == [
+        'postgresql://a/db',
+        'postgresql://b/db',
+    ]
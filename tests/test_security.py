@@ -4,7 +4,7 @@ from zoneinfo import ZoneInfo
 
 from jwt import decode, encode
 
-from todo_list_api.security import create_access_token
+from todo_list_api.security import create_access_token, token_versions
 
 
 def generate_expire(settings):
@@ -51,10 +51,30 @@ def test_invalid_claims_without_sub(client, user, settings):
     assert response.json() == {'detail': 'Could not validate credentials'}
 
 
-def test_invalid_email_doesnt_exists(client, user, settings):
+def test_invalid_claims_without_version(client, user, settings):
+    invalid_token = encode(
+        {
+            'sub': str(user.id),
+            'exp': generate_expire(settings),
+        },
+        settings.SECRET_KEY,
+        algorithm=settings.ALGORITHM,
+    )
+
+    response = client.get(
+        f'/api/v1/users/{user.id}',
+        headers={'Authorization': f'Bearer {invalid_token}'},
+    )
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+    assert response.json() == {'detail': 'Could not validate credentials'}
+
+
+def test_invalid_user_doesnt_exists(client, user, settings):
     token = encode(
         {
-            'sub': 'invalid@email.com',
+            'sub': '999',
+            'ver': 0,
             'exp': generate_expire(settings),
         },
         settings.SECRET_KEY,
@@ -68,3 +88,35 @@ def test_invalid_email_doesnt_exists(client, user, settings):
 
     assert response.status_code == HTTPStatus.NOT_FOUND
     assert response.json() == {'detail': 'User doesnt exists'}
+
+
+def test_token_revoked_after_user_update(client, user, token):
+    response = client.put(
+        f'/api/v1/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={
+            'username': user.username,
+            'email': user.email,
+            'password': 'n3w_p4ssword',
+        },
+    )
+    assert response.status_code == HTTPStatus.OK
+
+    response = client.get(
+        f'/api/v1/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+    assert response.json() == {'detail': 'Could not validate credentials'}
+
+
+def test_token_version_is_cached(client, user, token):
+    token_versions.clear()
+
+    client.post(
+        '/api/v1/auth/refresh_token',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert token_versions.get(user.id) == user.token_version
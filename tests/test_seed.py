@@ -0,0 +1,79 @@
+import random
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+from sqlalchemy import func, select
+
+from todo_list_api.hashing import check_password
+from todo_list_api.models.todos import Todo
+from todo_list_api.models.users import User
+from todo_list_api.seed import (
+    SeedOptions,
+    seed_database,
+    split_chunks,
+    zipf_counts,
+)
+
+
+def test_zipf_counts_should_be_skewed_and_keep_the_total():
+    expected_total = 10_000
+
+    counts = zipf_counts(expected_total, 100, 1.1, random.Random(0))
+
+    assert sum(counts) == expected_total
+    assert max(counts) > 10 * sorted(counts)[len(counts) // 2]
+
+
+def test_split_chunks_should_split_heavy_owners():
+    chunks = list(split_chunks([(1, 5), (2, 2)], chunk_size=3))
+
+    assert chunks == [((1, 3),), ((1, 2), (2, 1)), ((2, 1),)]
+
+
+@pytest.mark.asyncio
+async def test_seed_database_should_copy_users_and_todos(session):
+    expected_users, expected_todos = 5, 120
+
+    loaded = await seed_database(
+        session.bind.url.render_as_string(hide_password=False),
+        SeedOptions(
+            users=expected_users,
+            todos=expected_todos,
+            states={'done': 1},
+            workers=2,
+            chunk_size=50,
+            password='seeded-password',
+        ),
+    )
+
+    users = (await session.scalars(select(User))).all()
+    assert loaded == expected_todos
+    assert len(users) == expected_users
+    assert len({user.password for user in users}) == 1
+    assert check_password('seeded-password', users[0].password)
+    assert await session.scalar(select(func.count(Todo.id))) == expected_todos
+    assert await session.scalar(select(func.min(Todo.state))) == 'done'
+
+
+@pytest.mark.asyncio
+async def test_seed_database_should_write_local_timestamps(
+    session, monkeypatch
+):
+    zone = ZoneInfo('America/Sao_Paulo')
+    monkeypatch.setenv('PGTZ', zone.key)
+    started = datetime.now(zone).replace(tzinfo=None)
+
+    await seed_database(
+        session.bind.url.render_as_string(hide_password=False),
+        SeedOptions(users=2, todos=20, days=1, workers=1),
+    )
+
+    finished = datetime.now(zone).replace(tzinfo=None)
+    earliest, latest = (
+        await session.execute(
+            select(func.min(Todo.created_at), func.max(Todo.updated_at))
+        )
+    ).one()
+    assert started - timedelta(days=1) <= earliest
+    assert latest <= finished
@@ -0,0 +1,36 @@
+import gc
+from types import SimpleNamespace
+
+from todo_list_api import server
+from todo_list_api.database import engine
+
+
+def test_when_ready_should_freeze_the_preloaded_heap():
+    try:
+        server.when_ready(None)
+
+        assert gc.get_freeze_count() > 0
+    finally:
+        gc.unfreeze()
+
+
+def test_post_fork_should_give_the_worker_a_fresh_pool():
+    inherited_pool = engine.sync_engine.pool
+
+    server.post_fork(None, SimpleNamespace(pid=1))
+
+    assert engine.sync_engine.pool is not inherited_pool
+    assert type(engine.sync_engine.pool) is type(inherited_pool)
+
+
+def test_child_exit_should_mark_prometheus_files_dead(monkeypatch, tmp_path):
+    expected_pid = 4242
+    dead_pids = []
+    monkeypatch.setenv('PROMETHEUS_MULTIPROC_DIR', str(tmp_path))
+    monkeypatch.setattr(
+        server.multiprocess, 'mark_process_dead', dead_pids.append
+    )
+
+    server.child_exit(None, SimpleNamespace(pid=expected_pid))
+
+    assert dead_pids == [expected_pid]
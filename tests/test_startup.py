@@ -0,0 +1,67 @@
+import asyncio
+from time import perf_counter
+
+import pytest
+from alembic.config import Config
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from todo_list_api.migrate import upgrade_if_needed
+from todo_list_api.startup import StartupTimer, warm_up
+
+
+@pytest.mark.asyncio
+async def test_warm_up_should_open_connections_and_run_each_phase(
+    session, engine
+):
+    expected_connections = 2
+    warm_engine = create_async_engine(engine.url)
+    timer = StartupTimer(perf_counter())
+
+    try:
+        await warm_up(warm_engine, expected_connections, timer)
+        checked_in = warm_engine.pool.checkedin()
+    finally:
+        await warm_engine.dispose()
+
+    assert list(timer.phases) == [
+        'connections',
+        'statements',
+        'validators',
+        'hashing',
+    ]
+    assert checked_in == expected_connections
+    assert timer.summary().startswith('startup took ')
+
+
+@pytest.mark.asyncio
+async def test_warm_up_should_survive_an_unreachable_database():
+    engine = create_async_engine(
+        'postgresql+psycopg://nobody@127.0.0.1:1/nothing'
+    )
+    timer = StartupTimer(perf_counter())
+
+    await warm_up(engine, 1, timer)
+
+    assert list(timer.phases) == ['database', 'validators', 'hashing']
+
+
+@pytest.mark.asyncio
+async def test_upgrade_if_needed_should_skip_when_at_head(engine, monkeypatch):
+    autocommit = engine.execution_options(isolation_level='AUTOCOMMIT')
+    async with autocommit.connect() as conn:
+        await conn.execute(text('CREATE DATABASE migrations'))
+    database_url = engine.url.set(database='migrations').render_as_string(
+        hide_password=False
+    )
+    monkeypatch.setenv('DATABASE_URL', database_url)
+    config = Config('alembic.ini')
+
+    try:
+        assert await asyncio.to_thread(upgrade_if_needed, config, database_url)
+        assert not await asyncio.to_thread(
+            upgrade_if_needed, config, database_url
+        )
+    finally:
+        async with autocommit.connect() as conn:
+            await conn.execute(text('DROP DATABASE migrations'))
@@ -1,8 +1,39 @@
+import asyncio
+import csv
+import io
+import json
+from datetime import datetime, timedelta
 from http import HTTPStatus
 
+import msgpack
 import pytest
+from fastapi import WebSocketDisconnect, status
+from sqlalchemy import (
+    String,
+    event,
+    func,
+    insert,
+    literal,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.dialects.postgresql import REGCLASS
+from sqlalchemy.ext.asyncio import async_sessionmaker
 
-from todo_list_api.models.todos import Todo
+from todo_list_api.formats import DECODERS
+from todo_list_api.models.todos import Todo, TodoState, TodoTombstone
+from todo_list_api.pagination import encode_cursor, paginate
+from todo_list_api.purge import purge_tombstones
+from todo_list_api.routers.todos import (
+    CHANGES_KEY,
+    TODO_ORDERINGS,
+    changes_query,
+    filter_todos,
+    format_sse,
+    settings,
+)
+from todo_list_api.schemas.filters import FilterTodo
 
 from .conftest import TodoFactory
 
@@ -107,6 +138,28 @@ async def test_v1_get_read_with_title_filter(session, client, token, user):
     assert len(response.json()['todos']) == expected_todos
 
 
+@pytest.mark.asyncio
+async def test_v1_get_read_with_title_filter_escapes_wildcards(
+    session, client, token, user
+):
+    session.add_all([
+        TodoFactory(user_id=user.id, title='100% done'),
+        TodoFactory(user_id=user.id, title='100 done'),
+    ])
+    await session.commit()
+
+    response = client.get(
+        '/api/v1/todos/',
+        params={'title': '0% d'},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert [todo['title'] for todo in response.json()['todos']] == [
+        '100% done'
+    ]
+
+
 @pytest.mark.asyncio
 async def test_v1_get_read_with_description_filter(
     session, client, token, user
@@ -149,6 +202,118 @@ async def test_v1_get_read_with_state_filter(session, client, token, user):
     assert len(response.json()['todos']) == expected_todos
 
 
+@pytest.mark.asyncio
+async def test_v1_get_search_todos_ranks_title_matches_first(
+    session, client, token, user, other_user
+):
+    description_match = TodoFactory(
+        user_id=user.id, title='groceries', description='buy milk and bread'
+    )
+    title_match = TodoFactory(
+        user_id=user.id, title='milk the cows', description='at dawn'
+    )
+    session.add_all([
+        description_match,
+        title_match,
+        TodoFactory(user_id=user.id, title='unrelated', description='task'),
+        TodoFactory(user_id=other_user.id, title='milk', description='milk'),
+    ])
+    await session.commit()
+
+    response = client.get(
+        '/api/v1/todos/search?q=milk',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    results = response.json()['results']
+
+    assert response.status_code == HTTPStatus.OK
+    assert [result['id'] for result in results] == [
+        title_match.id,
+        description_match.id,
+    ]
+    assert results[0]['rank'] > results[1]['rank']
+    assert results[0]['title_highlight'] == '<mark>milk</mark> the cows'
+    assert '<mark>milk</mark>' in results[1]['description_highlight']
+
+
+@pytest.mark.asyncio
+async def test_v1_get_search_todos_with_cursor(session, client, token, user):
+    expected_todos = 5
+    session.add_all(
+        TodoFactory.create_batch(
+            expected_todos, user_id=user.id, title='write report'
+        )
+    )
+    await session.commit()
+
+    seen_ids = []
+    params = {'q': 'report', 'limit': 2}
+    while True:
+        response = client.get(
+            '/api/v1/todos/search',
+            params=params,
+            headers={'Authorization': f'Bearer {token}'},
+        )
+        data = response.json()
+        seen_ids.extend(result['id'] for result in data['results'])
+        if not data['next_cursor']:
+            break
+        params = {'q': 'report', 'limit': 2, 'cursor': data['next_cursor']}
+
+    assert len(set(seen_ids)) == expected_todos
+
+
+@pytest.mark.asyncio
+async def test_v1_get_search_todos_with_cursor_over_tied_ranks(
+    session, client, token, user
+):
+    expected_todos = 5
+    session.add_all(
+        TodoFactory.create_batch(
+            expected_todos,
+            user_id=user.id,
+            title='errand',
+            description='pick up the dry cleaning',
+        )
+    )
+    await session.commit()
+
+    seen_ids = []
+    params = {'q': 'cleaning', 'limit': 2}
+    while True:
+        data = client.get(
+            '/api/v1/todos/search',
+            params=params,
+            headers={'Authorization': f'Bearer {token}'},
+        ).json()
+        seen_ids.extend(result['id'] for result in data['results'])
+        if not data['next_cursor']:
+            break
+        params = {**params, 'cursor': data['next_cursor']}
+
+    assert len(seen_ids) == expected_todos
+    assert len(set(seen_ids)) == expected_todos
+
+
+def test_v1_get_search_todos_rejects_cursor_from_other_query(client, token):
+    response = client.get(
+        '/api/v1/todos/search',
+        params={'q': 'milk', 'cursor': 'eyJrIjoiaWQiLCJ2IjpbMV19'},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_v1_get_search_todos_requires_query(client, token):
+    response = client.get(
+        '/api/v1/todos/search',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
 @pytest.mark.asyncio
 async def test_v1_delete_todo(session, client, token, user):
     todo = TodoFactory(user_id=user.id)
@@ -218,3 +383,728 @@ async def test_v1_patch_todo(client, session, user, token):
 
     assert response.status_code == HTTPStatus.OK
     assert response.json()['title'] == 'test'
+
+
+@pytest.mark.asyncio
+async def test_v1_todo_writes_take_one_statement(client, session, user, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    statements = []
+
+    def record_statement(conn, cursor, statement, *args):
+        statements.append(statement.split()[0])
+
+    event.listen(
+        session.bind.sync_engine, 'before_cursor_execute', record_statement
+    )
+    created = client.post(
+        '/api/v1/todos/',
+        headers=headers,
+        json={'title': 'Test todo', 'description': 'Test description'},
+    )
+    updated = client.patch(
+        f'/api/v1/todos/{created.json()["id"]}',
+        headers=headers,
+        json={'state': 'done'},
+    )
+    deleted = client.delete(
+        f'/api/v1/todos/{created.json()["id"]}', headers=headers
+    )
+    event.remove(
+        session.bind.sync_engine, 'before_cursor_execute', record_statement
+    )
+
+    assert created.status_code == HTTPStatus.CREATED
+    assert updated.json()['state'] == 'done'
+    assert updated.json()['title'] == 'Test todo'
+    assert deleted.status_code == HTTPStatus.NO_CONTENT
+    assert statements == ['SELECT', 'INSERT', 'UPDATE', 'WITH']
+
+
+@pytest.mark.asyncio
+async def test_v1_get_read_with_cursor_pagination(
+    session, client, token, user
+):
+    expected_todos = 5
+    session.add_all(TodoFactory.create_batch(expected_todos, user_id=user.id))
+    await session.commit()
+
+    seen_ids = []
+    params = {'limit': 2}
+    while True:
+        response = client.get(
+            '/api/v1/todos/',
+            params=params,
+            headers={'Authorization': f'Bearer {token}'},
+        )
+        assert response.status_code == HTTPStatus.OK
+
+        data = response.json()
+        seen_ids.extend(todo['id'] for todo in data['todos'])
+        if not data['next_cursor']:
+            break
+        params = {'limit': 2, 'cursor': data['next_cursor']}
+
+    assert seen_ids == sorted(seen_ids)
+    assert len(seen_ids) == expected_todos
+
+
+@pytest.mark.asyncio
+async def test_v1_get_read_with_cursor_ordered_by_updated_at(
+    session, client, token, user
+):
+    expected_todos = 3
+    session.add_all(TodoFactory.create_batch(expected_todos, user_id=user.id))
+    await session.commit()
+
+    response = client.get(
+        '/api/v1/todos/?limit=2&order_by=updated_at',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    first_page = response.json()
+
+    response = client.get(
+        '/api/v1/todos/',
+        params={
+            'limit': 2,
+            'order_by': 'updated_at',
+            'cursor': first_page['next_cursor'],
+        },
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    second_page = response.json()
+
+    total = len(first_page['todos']) + len(second_page['todos'])
+    assert total == expected_todos
+    assert second_page['next_cursor'] is None
+
+
+def test_v1_get_read_with_invalid_cursor(client, token):
+    response = client.get(
+        '/api/v1/todos/?cursor=invalid',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json() == {'detail': 'Invalid cursor'}
+
+
+def test_v1_get_read_with_cursor_and_offset(client, token):
+    response = client.get(
+        '/api/v1/todos/?cursor=abc&offset=1',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+def test_v1_get_read_with_limit_above_max(client, token):
+    response = client.get(
+        '/api/v1/todos/?limit=1000',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_v1_get_read_todos_not_modified(session, client, token, user):
+    session.add_all(TodoFactory.create_batch(3, user_id=user.id))
+    await session.commit()
+
+    response = client.get(
+        '/api/v1/todos/',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    etag = response.headers['ETag']
+
+    not_modified = client.get(
+        '/api/v1/todos/?limit=10',
+        headers={
+            'Authorization': f'Bearer {token}',
+            'If-None-Match': etag,
+        },
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+    assert not_modified.headers['ETag'] == etag
+    assert not not_modified.content
+
+
+@pytest.mark.asyncio
+async def test_v1_get_read_todos_as_msgpack(session, client, token, user):
+    todo = TodoFactory(user_id=user.id)
+    session.add(todo)
+    await session.commit()
+
+    response = client.get(
+        '/api/v1/todos/',
+        headers={
+            'Authorization': f'Bearer {token}',
+            'Accept': 'application/msgpack, application/json;q=0.5',
+        },
+    )
+    body = msgpack.unpackb(response.content)
+
+    assert response.headers['content-type'] == 'application/msgpack'
+    assert body['todos'][0]['id'] == todo.id
+    assert body['todos'][0]['state'] == todo.state
+    assert body['todos'][0]['created_at'] == todo.created_at.isoformat()
+    assert body['next_cursor'] is None
+
+
+@pytest.mark.asyncio
+async def test_v1_get_read_todos_is_served_from_cache(
+    session, client, token, user
+):
+    headers = {'Authorization': f'Bearer {token}'}
+    cached = client.get('/api/v1/todos/', headers=headers)
+
+    session.add(TodoFactory(user_id=user.id))
+    await session.commit()
+
+    response = client.get('/api/v1/todos/', headers=headers)
+
+    assert response.json() == cached.json()
+    assert response.headers['ETag'] == cached.headers['ETag']
+
+
+def test_v1_get_read_todos_invalidated_by_writes(client, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    etag = client.get('/api/v1/todos/', headers=headers).headers['ETag']
+
+    todo_id = client.post(
+        '/api/v1/todos/',
+        headers=headers,
+        json={'title': 'Test todo', 'description': 'Test description'},
+    ).json()['id']
+    created = client.get(
+        '/api/v1/todos/', headers={**headers, 'If-None-Match': etag}
+    )
+
+    client.patch(
+        f'/api/v1/todos/{todo_id}', headers=headers, json={'state': 'done'}
+    )
+    updated = client.get('/api/v1/todos/', headers=headers)
+
+    client.delete(f'/api/v1/todos/{todo_id}', headers=headers)
+    deleted = client.get('/api/v1/todos/', headers=headers)
+
+    assert created.status_code == HTTPStatus.OK
+    assert created.headers['ETag'] != etag
+    assert updated.json()['todos'][0]['state'] == 'done'
+    assert deleted.json()['todos'] == []
+    assert deleted.headers['ETag'] == etag
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ('filters', 'index'),
+    [
+        (FilterTodo(), 'ix_todos_user_id_id'),
+        (FilterTodo(state='todo'), 'ix_todos_user_id_state_id'),
+        (FilterTodo(order_by='updated_at'), 'ix_todos_user_id_updated_at_id'),
+        (FilterTodo(title='task'), 'ix_todos_title_trgm'),
+        (FilterTodo(description='descr'), 'ix_todos_description_trgm'),
+    ],
+)
+async def test_todo_filters_are_served_by_indexes(
+    session, user, other_user, filters, index
+):
+    for user_id, total in ((user.id, 1000), (other_user.id, 10000)):
+        await session.execute(
+            insert(Todo).from_select(
+                [Todo.user_id, Todo.title, Todo.description, Todo.state],
+                select(
+                    literal(user_id),
+                    func.md5(func.random().cast(String)),
+                    func.md5(func.random().cast(String)),
+                    literal(TodoState.draft),
+                ).select_from(func.generate_series(1, total)),
+            )
+        )
+    session.add_all(
+        TodoFactory.create_batch(
+            5, user_id=user.id, title='task', description='descr', state='todo'
+        )
+    )
+    await session.commit()
+    for trgm_index in ('ix_todos_title_trgm', 'ix_todos_description_trgm'):
+        await session.execute(
+            select(
+                func.gin_clean_pending_list(literal(trgm_index).cast(REGCLASS))
+            )
+        )
+    await session.execute(text('ANALYZE todos'))
+    await session.execute(text('SET LOCAL enable_seqscan = off'))
+
+    query = paginate(
+        filter_todos(user.id, filters),
+        TODO_ORDERINGS[filters.order_by],
+        filters,
+        key=filters.order_by,
+    )
+    compiled = query.compile(dialect=session.bind.dialect)
+    connection = await session.connection()
+    result = await connection.exec_driver_sql(
+        f'EXPLAIN {compiled}', compiled.params
+    )
+    plan = '\n'.join(result.scalars())
+    await session.rollback()
+
+    assert 'Seq Scan' not in plan
+    assert index in plan
+
+
+@pytest.mark.asyncio
+async def test_v1_post_bulk_todos(session, client, token, user, other_user):
+    owned = TodoFactory.create_batch(2, user_id=user.id, title='old title')
+    foreign = TodoFactory.create_batch(2, user_id=other_user.id)
+    session.add_all([*owned, *foreign])
+    await session.commit()
+
+    statements = []
+
+    def record_statement(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(
+        session.bind.sync_engine, 'before_cursor_execute', record_statement
+    )
+    response = client.post(
+        '/api/v1/todos/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json={
+            'operations': [
+                {'op': 'create', 'title': 'first', 'description': 'a'},
+                {'op': 'update', 'id': owned[0].id, 'state': 'done'},
+                {'op': 'delete', 'id': owned[1].id},
+                {'op': 'update', 'id': foreign[0].id, 'title': 'hijack'},
+                {'op': 'create', 'title': 'second', 'description': 'b'},
+                {'op': 'delete', 'id': foreign[1].id},
+            ]
+        },
+    )
+    event.remove(
+        session.bind.sync_engine, 'before_cursor_execute', record_statement
+    )
+    results = response.json()['results']
+
+    assert response.status_code == HTTPStatus.OK
+    assert [result['status'] for result in results] == [
+        HTTPStatus.CREATED,
+        HTTPStatus.OK,
+        HTTPStatus.NO_CONTENT,
+        HTTPStatus.NOT_FOUND,
+        HTTPStatus.CREATED,
+        HTTPStatus.NOT_FOUND,
+    ]
+    assert results[0]['todo']['title'] == 'first'
+    assert results[4]['todo']['title'] == 'second'
+    assert results[1]['todo']['state'] == 'done'
+    assert results[1]['todo']['title'] == 'old title'
+    writes = [s.split()[0] for s in statements if not s.startswith('SELECT')]
+    assert writes == ['INSERT', 'UPDATE', 'WITH', 'WITH', 'WITH']
+
+
+def test_v1_post_bulk_todos_rejects_too_many_operations(
+    client, token, monkeypatch
+):
+    monkeypatch.setattr(settings, 'BULK_MAX_OPERATIONS', 1)
+
+    response = client.post(
+        '/api/v1/todos/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json={
+            'operations': [
+                {'op': 'delete', 'id': 1},
+                {'op': 'delete', 'id': 2},
+            ]
+        },
+    )
+
+    assert response.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+
+@pytest.mark.parametrize(
+    'operations',
+    [
+        [
+            {'op': 'update', 'id': 1, 'title': 'first'},
+            {'op': 'update', 'id': 1, 'title': 'second'},
+        ],
+        [
+            {'op': 'delete', 'id': 1},
+            {'op': 'update', 'id': 1, 'title': 'revived'},
+        ],
+    ],
+)
+def test_v1_post_bulk_todos_rejects_duplicated_targets(
+    client, token, operations
+):
+    response = client.post(
+        '/api/v1/todos/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'operations': operations},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_v1_get_export_todos_as_ndjson(
+    session, client, token, user, other_user
+):
+    expected_todos = 3
+    session.add_all(
+        TodoFactory.create_batch(expected_todos, user_id=user.id, state='todo')
+    )
+    session.add_all([
+        TodoFactory(user_id=user.id, state='done'),
+        TodoFactory(user_id=other_user.id, state='todo'),
+    ])
+    await session.commit()
+
+    response = client.get(
+        '/api/v1/todos/export?state=todo',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    lines = [json.loads(line) for line in response.text.splitlines()]
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    assert len(lines) == expected_todos
+    assert {line['state'] for line in lines} == {'todo'}
+    assert set(lines[0]) == {
+        'id',
+        'title',
+        'description',
+        'state',
+        'created_at',
+        'updated_at',
+    }
+
+
+@pytest.mark.asyncio
+async def test_v1_get_export_todos_as_csv(session, client, token, user):
+    todo = TodoFactory(user_id=user.id, title='a, "quoted" title')
+    session.add(todo)
+    await session.commit()
+
+    response = client.get(
+        '/api/v1/todos/export?format=csv',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'].startswith('text/csv')
+    assert [row['title'] for row in rows] == ['a, "quoted" title']
+    assert rows[0]['id'] == str(todo.id)
+
+
+def test_v1_post_import_todos_from_ndjson(client, token):
+    content = b'\n'.join([
+        b'{"title": "first", "description": "a", "state": "todo"}',
+        b'{"title": "no"}',
+        b'',
+        b'not json',
+        b'{"title": "second", "description": "b"}',
+    ])
+
+    response = client.post(
+        '/api/v1/todos/import',
+        headers={'Authorization': f'Bearer {token}'},
+        files={'file': ('todos.ndjson', content, 'application/x-ndjson')},
+    )
+    listed = client.get(
+        '/api/v1/todos/',
+        headers={'Authorization': f'Bearer {token}'},
+    ).json()['todos']
+
+    assert response.status_code == HTTPStatus.CREATED
+    assert response.json()['imported'] == len(listed)
+    assert [error['line'] for error in response.json()['errors']] == [2, 4]
+    assert [(todo['title'], todo['state']) for todo in listed] == [
+        ('first', 'todo'),
+        ('second', 'draft'),
+    ]
+
+
+def test_v1_post_import_todos_decodes_off_the_event_loop(
+    client, token, monkeypatch
+):
+    expected_imported = 5
+    loop_threads = []
+
+    def decode_ndjson(file):
+        for line_number, record in enumerate(file, start=1):
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                loop_threads.append(False)
+            else:
+                loop_threads.append(True)
+            yield line_number, json.loads(record)
+
+    monkeypatch.setattr(settings, 'IMPORT_CHUNK_SIZE', 2)
+    monkeypatch.setitem(DECODERS, 'ndjson', decode_ndjson)
+    content = b'\n'.join(
+        b'{"title": "task %d"}' % index for index in range(expected_imported)
+    )
+
+    response = client.post(
+        '/api/v1/todos/import',
+        headers={'Authorization': f'Bearer {token}'},
+        files={'file': ('todos.ndjson', content)},
+    )
+
+    assert response.status_code == HTTPStatus.CREATED
+    assert response.json()['imported'] == expected_imported
+    assert loop_threads == [False] * expected_imported
+
+
+def test_v1_post_import_todos_from_csv(client, token):
+    content = b'title,description,state\n"multi\nline",desc,doing\nplain,,\n'
+
+    response = client.post(
+        '/api/v1/todos/import',
+        headers={'Authorization': f'Bearer {token}'},
+        files={'file': ('todos.csv', content, 'text/csv')},
+    )
+    listed = client.get(
+        '/api/v1/todos/',
+        headers={'Authorization': f'Bearer {token}'},
+    ).json()['todos']
+
+    assert response.status_code == HTTPStatus.CREATED
+    assert response.json() == {'imported': 2, 'failed': 0, 'errors': []}
+    assert [(todo['title'], todo['state']) for todo in listed] == [
+        ('multi\nline', 'doing'),
+        ('plain', 'draft'),
+    ]
+
+
+def test_v1_post_import_todos_atomic_rolls_back(client, token):
+    content = b'{"title": "first", "description": "a"}\n{"title": "no"}\n'
+
+    response = client.post(
+        '/api/v1/todos/import?mode=atomic',
+        headers={'Authorization': f'Bearer {token}'},
+        files={'file': ('todos.ndjson', content)},
+    )
+    listed = client.get(
+        '/api/v1/todos/',
+        headers={'Authorization': f'Bearer {token}'},
+    ).json()['todos']
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert response.json()['detail']['failed'] == 1
+    assert listed == []
+
+
+def test_v1_websocket_stream_todos(client, token):
+    with client.websocket_connect(
+        f'/api/v1/todos/stream?token={token}'
+    ) as websocket:
+        todo_id = client.post(
+            '/api/v1/todos/',
+            headers={'Authorization': f'Bearer {token}'},
+            json={'title': 'task', 'description': 'test', 'state': 'draft'},
+        ).json()['id']
+        created = websocket.receive_json()
+
+        client.patch(
+            f'/api/v1/todos/{todo_id}',
+            headers={'Authorization': f'Bearer {token}'},
+            json={'state': 'done'},
+        )
+        updated = websocket.receive_json()
+
+        client.delete(
+            f'/api/v1/todos/{todo_id}',
+            headers={'Authorization': f'Bearer {token}'},
+        )
+        deleted = websocket.receive_json()
+
+    assert created['op'] == 'created'
+    assert created['todo']['id'] == todo_id
+    assert created['todo']['title'] == 'task'
+    assert updated['op'] == 'updated'
+    assert updated['todo']['state'] == 'done'
+    assert deleted == {'op': 'deleted', 'id': todo_id}
+
+
+def test_v1_websocket_stream_todos_rejects_invalid_token(client):
+    with (
+        pytest.raises(WebSocketDisconnect) as disconnect,
+        client.websocket_connect('/api/v1/todos/stream?token=invalid'),
+    ):
+        pass
+
+    assert disconnect.value.code == status.WS_1008_POLICY_VIOLATION
+
+
+def test_v1_get_stream_todos_requires_token(client):
+    response = client.get('/api/v1/todos/stream')
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_format_sse():
+    assert format_sse(None) == b': keep-alive\n\n'
+    assert format_sse({'op': 'deleted', 'id': 1}) == (
+        b'event: deleted\ndata: {"op":"deleted","id":1}\n\n'
+    )
+
+
+@pytest.mark.asyncio
+async def test_v1_get_todo_changes_returns_updates_and_tombstones(
+    session, client, token, user, monkeypatch
+):
+    monkeypatch.setattr(settings, 'TODO_SYNC_LAG_SECONDS', 0)
+    headers = {'Authorization': f'Bearer {token}'}
+    kept, updated, deleted = TodoFactory.create_batch(3, user_id=user.id)
+    session.add_all([kept, updated, deleted])
+    await session.commit()
+
+    full = client.get('/api/v1/todos/changes', headers=headers).json()
+    client.patch(
+        f'/api/v1/todos/{updated.id}', headers=headers, json={'state': 'done'}
+    )
+    client.delete(f'/api/v1/todos/{deleted.id}', headers=headers)
+    delta = client.get(
+        '/api/v1/todos/changes',
+        headers=headers,
+        params={'since': full['watermark']},
+    ).json()
+
+    assert [todo['id'] for todo in full['todos']] == [
+        kept.id,
+        updated.id,
+        deleted.id,
+    ]
+    assert full['deleted'] == []
+    assert full['has_more'] is False
+    assert [todo['id'] for todo in delta['todos']] == [updated.id]
+    assert delta['todos'][0]['state'] == 'done'
+    assert delta['deleted'] == [deleted.id]
+
+
+@pytest.mark.asyncio
+async def test_v1_get_todo_changes_pages_with_watermark(
+    session, client, token, user, monkeypatch
+):
+    monkeypatch.setattr(settings, 'TODO_SYNC_LAG_SECONDS', 0)
+    headers = {'Authorization': f'Bearer {token}'}
+    todos = TodoFactory.create_batch(3, user_id=user.id)
+    session.add_all(todos)
+    await session.commit()
+
+    first = client.get(
+        '/api/v1/todos/changes', headers=headers, params={'limit': 2}
+    ).json()
+    second = client.get(
+        '/api/v1/todos/changes',
+        headers=headers,
+        params={'limit': 2, 'since': first['watermark']},
+    ).json()
+
+    assert first['has_more'] is True
+    assert [todo['id'] for todo in first['todos']] == [
+        todos[0].id,
+        todos[1].id,
+    ]
+    assert second['has_more'] is False
+    assert [todo['id'] for todo in second['todos']] == [todos[2].id]
+
+
+@pytest.mark.asyncio
+async def test_v1_get_todo_changes_stay_behind_the_lag_window(
+    session, client, token, user
+):
+    headers = {'Authorization': f'Bearer {token}'}
+    old, recent = TodoFactory.create_batch(2, user_id=user.id)
+    session.add_all([old, recent])
+    await session.flush()
+    await session.execute(
+        update(Todo)
+        .where(Todo.id == old.id)
+        .values(updated_at=func.localtimestamp() - timedelta(minutes=1))
+    )
+    await session.commit()
+
+    first = client.get(
+        '/api/v1/todos/changes', headers=headers, params={'limit': 1}
+    ).json()
+    second = client.get(
+        '/api/v1/todos/changes',
+        headers=headers,
+        params={'limit': 1, 'since': first['watermark']},
+    ).json()
+
+    assert [todo['id'] for todo in first['todos']] == [old.id]
+    assert second['todos'] == []
+    assert second['has_more'] is False
+
+
+def test_v1_get_todo_changes_rejects_expired_watermark(client, token):
+    since = encode_cursor(CHANGES_KEY, (datetime(2000, 1, 1), 0))
+
+    response = client.get(
+        '/api/v1/todos/changes',
+        headers={'Authorization': f'Bearer {token}'},
+        params={'since': since},
+    )
+
+    assert response.status_code == HTTPStatus.GONE
+
+
+def test_v1_get_todo_changes_rejects_invalid_watermark(client, token):
+    response = client.get(
+        '/api/v1/todos/changes',
+        headers={'Authorization': f'Bearer {token}'},
+        params={'since': 'invalid'},
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_todo_changes_are_served_by_indexes(session, user):
+    await session.execute(text('SET LOCAL enable_seqscan = off'))
+
+    query = changes_query(
+        user.id, (datetime(2025, 5, 20), 0), datetime(2025, 5, 21), 11
+    )
+    compiled = query.compile(dialect=session.bind.dialect)
+    connection = await session.connection()
+    result = await connection.exec_driver_sql(
+        f'EXPLAIN {compiled}', compiled.params
+    )
+    plan = '\n'.join(result.scalars())
+    await session.rollback()
+
+    assert 'Seq Scan' not in plan
+    assert 'ix_todos_user_id_updated_at_id' in plan
+    assert 'ix_todo_tombstones_user_id_deleted_at_todo_id' in plan
+
+
+@pytest.mark.asyncio
+async def test_purge_tombstones_removes_only_expired(session, user):
+    expected_purged = 2
+    retention_days = 30
+    for todo_id, age in ((1, 31), (2, 45), (3, 1)):
+        tombstone = TodoTombstone(todo_id=todo_id, user_id=user.id)
+        session.add(tombstone)
+        await session.flush()
+        tombstone.deleted_at = datetime.now() - timedelta(days=age)
+    await session.commit()
+
+    purged = await purge_tombstones(
+        async_sessionmaker(session.bind), retention_days, batch_size=1
+    )
+    remaining = await session.scalars(select(TodoTombstone.todo_id))
+
+    assert purged == expected_purged
+    assert list(remaining) == [3]
@@ -1,6 +1,19 @@
 from http import HTTPStatus
 
+import msgpack
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import event, func, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from todo_list_api.models.todos import Todo
+from todo_list_api.models.users import User
+from todo_list_api.purge import purge_deleted_users
+from todo_list_api.routers import users
 from todo_list_api.schemas.users import UserResponse
+from todo_list_api.security import hashing_executor
+
+from .conftest import TodoFactory
 
 
 def test_api_v1_users_post_should_create_user(client):
@@ -21,6 +34,36 @@ def test_api_v1_users_post_should_create_user(client):
     }
 
 
+def test_api_v1_users_post_should_raise_when_hashing_is_busy(
+    client, monkeypatch
+):
+    labels = {'operation': 'hash_password'}
+    hashes_before = REGISTRY.get_sample_value(
+        'password_hash_duration_seconds_count', labels
+    )
+    monkeypatch.setattr(
+        hashing_executor, 'queue_size', -hashing_executor.workers
+    )
+
+    response = client.post(
+        '/api/v1/users',
+        json={
+            'username': 'test_name',
+            'email': 'email@example.com',
+            'password': 'test1234',
+        },
+    )
+
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.headers['retry-after'] == '1'
+    assert (
+        REGISTRY.get_sample_value(
+            'password_hash_duration_seconds_count', labels
+        )
+        == hashes_before
+    )
+
+
 def test_api_v1_users_post_should_raise_username_exception(client, user):
     response = client.post(
         '/api/v1/users',
@@ -57,7 +100,44 @@ def test_api_v1_users_get_should_return_one_in_users(client, user, token):
     )
 
     assert response.status_code == HTTPStatus.OK
-    assert response.json() == {'users': [user_schema]}
+    assert response.json() == {'users': [user_schema], 'next_cursor': None}
+
+
+def test_api_v1_users_get_should_negotiate_msgpack(client, user, token):
+    user_schema = UserResponse.model_validate(user).model_dump()
+    response = client.get(
+        '/api/v1/users',
+        headers={
+            'Authorization': f'Bearer {token}',
+            'Accept': 'application/msgpack',
+        },
+    )
+
+    assert response.headers['content-type'] == 'application/msgpack'
+    assert msgpack.unpackb(response.content) == {
+        'users': [user_schema],
+        'next_cursor': None,
+    }
+
+
+@pytest.mark.parametrize(
+    ('accept', 'expected_media_type'),
+    [
+        ('application/msgpack;q=0, application/json', 'application/json'),
+        ('application/json;q=0.5, application/msgpack', 'application/msgpack'),
+        ('application/msgpack;q=0.4, */*;q=0.8', 'application/json'),
+        ('application/msgpack, application/json', 'application/msgpack'),
+    ],
+)
+def test_api_v1_users_get_should_honor_accept_quality(
+    client, user, token, accept, expected_media_type
+):
+    response = client.get(
+        '/api/v1/users',
+        headers={'Authorization': f'Bearer {token}', 'Accept': accept},
+    )
+
+    assert response.headers['content-type'] == expected_media_type
 
 
 def test_api_v1_users_put_should_update_user(client, user, token):
@@ -126,6 +206,50 @@ def test_api_v1_users_get_should_return_user(client, user, token):
     }
 
 
+@pytest.mark.asyncio
+async def test_api_v1_users_get_should_include_capped_todos(
+    client, session, user, token, monkeypatch
+):
+    expected_todos = 2
+    monkeypatch.setattr(users.settings, 'USER_INCLUDE_TODOS_LIMIT', 2)
+    session.add_all(TodoFactory.create_batch(3, user_id=user.id))
+    await session.commit()
+
+    response = client.get(
+        f'/api/v1/users/{user.id}',
+        params={'include': 'todos'},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    todos = response.json()['todos']
+    assert len(todos) == expected_todos
+    assert [todo['id'] for todo in todos] == sorted(
+        todo['id'] for todo in todos
+    )
+
+
+@pytest.mark.asyncio
+async def test_api_v1_users_list_should_include_todos_per_user(
+    client, session, user, other_user, token
+):
+    session.add_all(TodoFactory.create_batch(3, user_id=user.id))
+    session.add(TodoFactory(user_id=other_user.id))
+    await session.commit()
+
+    response = client.get(
+        '/api/v1/users/',
+        params={'include': 'todos'},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert [len(user['todos']) for user in response.json()['users']] == [
+        3,
+        1,
+    ]
+
+
 def test_api_v1_users_get_should_raise_exception(
     client, user, other_user, token
 ):
@@ -147,6 +271,95 @@ def test_api_v1_users_delete_should_remove_user(client, user, token):
     assert response.content == b''
 
 
+@pytest.mark.asyncio
+async def test_api_v1_users_delete_should_cascade_in_database(
+    client, session, user, other_user, token
+):
+    session.add_all(TodoFactory.create_batch(5, user_id=user.id))
+    session.add(TodoFactory(user_id=other_user.id))
+    await session.commit()
+    statements = []
+
+    def record_statement(conn, cursor, statement, *args):
+        if statement.startswith('DELETE'):
+            statements.append(statement)
+
+    event.listen(
+        session.bind.sync_engine, 'before_cursor_execute', record_statement
+    )
+    response = client.delete(
+        f'/api/v1/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    event.remove(
+        session.bind.sync_engine, 'before_cursor_execute', record_statement
+    )
+
+    assert response.status_code == HTTPStatus.NO_CONTENT
+    assert len(statements) == 1
+    assert await session.scalar(select(func.count(Todo.id))) == 1
+
+
+@pytest.mark.asyncio
+async def test_api_v1_users_delete_should_purge_in_background(
+    client, session, user, token, monkeypatch
+):
+    monkeypatch.setattr(users.settings, 'PURGE_BATCH_SIZE', 2)
+    session.add_all(TodoFactory.create_batch(5, user_id=user.id))
+    await session.commit()
+
+    response = client.delete(
+        f'/api/v1/users/{user.id}?purge=background',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.NO_CONTENT
+    assert await session.scalar(select(func.count(Todo.id))) == 0
+    assert await session.scalar(select(func.count(User.id))) == 0
+
+
+def test_api_v1_users_delete_in_background_hides_user_at_once(
+    client, user, token, monkeypatch
+):
+    async def pending_purge(*args):
+        pass
+
+    monkeypatch.setattr(users, 'purge_user', pending_purge)
+    headers = {'Authorization': f'Bearer {token}'}
+
+    client.delete(f'/api/v1/users/{user.id}?purge=background', headers=headers)
+    login = client.post(
+        '/api/v1/auth/token',
+        data={'username': user.email, 'password': user.clean_password},
+    )
+    response = client.get('/api/v1/users/', headers=headers)
+
+    assert login.status_code == HTTPStatus.UNAUTHORIZED
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_purge_deleted_users_should_finish_an_interrupted_purge(
+    session, user, other_user
+):
+    session.add_all(TodoFactory.create_batch(5, user_id=user.id))
+    session.add(TodoFactory(user_id=other_user.id))
+    await session.execute(
+        update(User).where(User.id == user.id).values(deleted_at=func.now())
+    )
+    await session.commit()
+
+    purged = await purge_deleted_users(
+        async_sessionmaker(session.bind), batch_size=2
+    )
+    remaining_users = await session.scalars(select(User.id))
+    remaining_todos = await session.scalars(select(Todo.user_id))
+
+    assert purged == 1
+    assert list(remaining_users) == [other_user.id]
+    assert list(remaining_todos) == [other_user.id]
+
+
 def test_api_v1_users_delete_should_raise_exception(
     client, user, other_user, token
 ):
@@ -156,3 +369,24 @@ def test_api_v1_users_delete_should_raise_exception(
     )
 
     assert response.status_code == HTTPStatus.FORBIDDEN
+
+
+def test_api_v1_users_get_should_paginate_with_cursor(
+    client, user, other_user, token
+):
+    response = client.get(
+        '/api/v1/users?limit=1',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    first_page = response.json()
+
+    response = client.get(
+        '/api/v1/users',
+        params={'limit': 1, 'cursor': first_page['next_cursor']},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    second_page = response.json()
+
+    assert [u['id'] for u in first_page['users']] == [user.id]
+    assert [u['id'] for u in second_page['users']] == [other_user.id]
+    assert second_page['next_cursor'] is None
@@ -0,0 +1,3 @@
+from time import perf_counter
+
+IMPORT_STARTED = perf_counter()
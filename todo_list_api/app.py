@@ -1,15 +1,45 @@
+from contextlib import asynccontextmanager
 from http import HTTPStatus
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.responses import HTMLResponse
+from prometheus_client import CONTENT_TYPE_LATEST
 
-from todo_list_api.routers import auth, todos, users
+from todo_list_api.database import engine
+from todo_list_api.invalidation import cache_invalidator
+from todo_list_api.querybudget import QueryBudgetMiddleware
+from todo_list_api.routers import auth, internal, todos, users
 from todo_list_api.schemas.root import HealthCheckResponse
+from todo_list_api.security import hashing_executor
+from todo_list_api.settings import Settings
+from todo_list_api.startup import logger, startup_timer, warm_up
+from todo_list_api.telemetry import MetricsMiddleware, render_metrics
 
-app = FastAPI(title='ToDo List API')
+settings = Settings()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    startup_timer.mark('server')
+    if settings.STARTUP_WARMUP:
+        await warm_up(
+            engine, settings.STARTUP_WARMUP_CONNECTIONS, startup_timer
+        )
+    if settings.CACHE_INVALIDATION:
+        cache_invalidator.start()
+    logger.info(startup_timer.summary())
+    yield
+    await cache_invalidator.stop()
+    hashing_executor.shutdown()
+
+
+app = FastAPI(title='ToDo List API', lifespan=lifespan)
+app.add_middleware(QueryBudgetMiddleware)
+app.add_middleware(MetricsMiddleware)
 app.include_router(auth.router)
 app.include_router(users.router)
 app.include_router(todos.router)
+app.include_router(internal.router)
 
 
 @app.get('/', status_code=HTTPStatus.OK, response_model=HealthCheckResponse)
@@ -24,3 +54,11 @@ async def read_root():
 )
 async def read_hello_world():
     return '<html><body><h1>Hello World!</h1></body></html>'
+
+
+@app.get('/metrics', status_code=HTTPStatus.OK, include_in_schema=False)
+async def read_metrics():
+    return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+
+startup_timer.mark('imports')
@@ -0,0 +1,92 @@
+import asyncio
+from datetime import timedelta
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from todo_list_api.database import engine, session_factory
+from todo_list_api.models.todos import Todo, TodoArchive, TodoState
+from todo_list_api.purge import purge_trash, run_in_batches
+from todo_list_api.settings import Settings
+
+ARCHIVED_KEYS = (
+    'id',
+    'title',
+    'description',
+    'user_id',
+    'state',
+    'created_at',
+    'updated_at',
+)
+
+
+def archive_statement(state: TodoState, older_than_days: int, batch_size: int):
+    batch = (
+        select(Todo.id)
+        .where(
+            Todo.state == state,
+            Todo.updated_at
+            < func.localtimestamp() - timedelta(days=older_than_days),
+        )
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    moved = (
+        delete(Todo)
+        .where(Todo.id.in_(batch))
+        .returning(*(getattr(Todo, key) for key in ARCHIVED_KEYS))
+        .cte()
+    )
+
+    return insert(TodoArchive).from_select(list(ARCHIVED_KEYS), select(moved))
+
+
+async def archive_todos(
+    session_factory: async_sessionmaker,
+    done_days: int,
+    trash_days: int,
+    batch_size: int,
+):
+    return {
+        state.value: await run_in_batches(
+            session_factory,
+            archive_statement(state, days, batch_size),
+            batch_size,
+        )
+        for state, days in (
+            (TodoState.done, done_days),
+            (TodoState.trash, trash_days),
+        )
+    }
+
+
+async def run():
+    settings = Settings()
+    try:
+        archived = await archive_todos(
+            session_factory,
+            settings.ARCHIVE_DONE_DAYS,
+            settings.ARCHIVE_TRASH_DAYS,
+            settings.ARCHIVE_BATCH_SIZE,
+        )
+        purged = await purge_trash(
+            session_factory,
+            settings.TRASH_RETENTION_DAYS,
+            settings.ARCHIVE_BATCH_SIZE,
+        )
+    finally:
+        await engine.dispose()
+
+    print(
+        f'archived {archived["done"]} done and {archived["trash"]} trash '
+        f'todos, purged {purged} expired trash todos'
+    )
+
+
+def main():
+    asyncio.run(run())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from hashlib import blake2b
+from time import monotonic
+
+
+class TTLCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key, default=None):
+        item = self._data.get(key)
+        if item is None:
+            return default
+
+        value, expires_at = item
+        if expires_at <= monotonic():
+            del self._data[key]
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        self._data[key] = (value, monotonic() + self.ttl)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class ResponseCache(ABC):
+    @abstractmethod
+    async def get(self, key: str): ...
+
+    @abstractmethod
+    async def set(self, key: str, value): ...
+
+    @abstractmethod
+    async def generation(self, namespace): ...
+
+    @abstractmethod
+    async def bump(self, namespace): ...
+
+    @abstractmethod
+    async def clear(self): ...
+
+
+class MemoryResponseCache(ResponseCache):
+    def __init__(self, maxsize: int, ttl: float):
+        self._responses = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._generations: dict = {}
+        self._epoch = 0
+
+    async def get(self, key: str):
+        return self._responses.get(key)
+
+    async def set(self, key: str, value):
+        self._responses.set(key, value)
+
+    async def generation(self, namespace):
+        return self._epoch + self._generations.get(namespace, 0)
+
+    async def bump(self, namespace):
+        self._generations[namespace] = self._generations.get(namespace, 0) + 1
+
+    async def clear(self):
+        self._responses.clear()
+        self._epoch += 1
+
+
+def make_etag(body: bytes):
+    return f'"{blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str):
+    if not if_none_match:
+        return False
+
+    candidates = {
+        candidate.strip().removeprefix('W/')
+        for candidate in if_none_match.split(',')
+    }
+    return '*' in candidates or etag in candidates
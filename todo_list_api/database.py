@@ -1,15 +1,92 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from time import perf_counter
 
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from todo_list_api.metrics import Histogram
 from todo_list_api.settings import Settings
+from todo_list_api.telemetry import record_statement
 
-engine = create_async_engine(
-    Settings().DATABASE_URL,
-    max_overflow=10,
-    pool_size=5,
-    pool_recycle=200,
-)
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.waiting = 0
+        self.wait_time = Histogram()
+
+    def _do_get(self):
+        self.waiting += 1
+        start = perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.waiting -= 1
+            self.wait_time.observe(perf_counter() - start)
+
+    def stats(self):
+        return {
+            'size': self.size(),
+            'max_overflow': self._max_overflow,
+            'checked_out': self.checkedout(),
+            'checked_in': self.checkedin(),
+            'overflow': max(self.overflow(), 0),
+            'waiting': self.waiting,
+            'wait_time': self.wait_time.snapshot(),
+        }
+
+
+def _start_statement(conn, *args):
+    conn.info['statement_start'] = perf_counter()
+
+
+def _finish_statement(conn, cursor, statement, *args):
+    record_statement(
+        statement, perf_counter() - conn.info.pop('statement_start')
+    )
+
+
+def instrument_engine(engine: AsyncEngine):
+    event.listen(engine.sync_engine, 'before_cursor_execute', _start_statement)
+    event.listen(engine.sync_engine, 'after_cursor_execute', _finish_statement)
+    return engine
+
+
+def create_engine_from_settings(settings: Settings, url: str | None = None):
+    connect_args = {}
+    if settings.DATABASE_STATEMENT_TIMEOUT is not None:
+        connect_args['options'] = (
+            f'-c statement_timeout={settings.DATABASE_STATEMENT_TIMEOUT}'
+        )
+
+    engine = create_async_engine(
+        url or settings.DATABASE_URL,
+        poolclass=InstrumentedPool,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+        pool_use_lifo=settings.DATABASE_POOL_USE_LIFO,
+        connect_args=connect_args,
+    )
+
+    return instrument_engine(engine)
+
+
+engine = create_engine_from_settings(Settings())
+session_factory = async_sessionmaker(engine, expire_on_commit=False)
 
 
 async def get_session():  # pragma: no cover
     async with AsyncSession(engine, expire_on_commit=False) as session:
         yield session
+
+
+def get_session_factory():
+    return session_factory
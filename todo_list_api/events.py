@@ -0,0 +1,127 @@
+import asyncio
+import logging
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+import orjson
+import psycopg
+from sqlalchemy.engine import make_url
+
+from todo_list_api.models.todos import TODO_EVENTS_CHANNEL
+from todo_list_api.settings import Settings
+
+RESET = {'op': 'reset'}
+RECONNECT_SECONDS = 1
+
+logger = logging.getLogger('uvicorn.error')
+settings = Settings()
+
+
+def conninfo(database_url: str):
+    return (
+        make_url(database_url)
+        .set(drivername='postgresql')
+        .render_as_string(hide_password=False)
+    )
+
+
+class Subscription:
+    def __init__(self, queue_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def put(self, event: dict):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self):
+        if self.overflowed:
+            self.overflowed = False
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            return RESET
+
+        return await self.queue.get()
+
+
+class TodoEventBroker:
+    def __init__(self, database_url: str, queue_size: int):
+        self.conninfo = conninfo(database_url)
+        self.queue_size = queue_size
+        self.subscribers: dict[int, set[Subscription]] = defaultdict(set)
+        self._listener: asyncio.Task | None = None
+        self._lock = asyncio.Lock()
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: int):
+        subscription = Subscription(self.queue_size)
+        async with self._lock:
+            if self._listener is None:
+                await self._start()
+            self.subscribers[user_id].add(subscription)
+
+        try:
+            yield subscription
+        finally:
+            self.subscribers[user_id].discard(subscription)
+            if not self.subscribers[user_id]:
+                del self.subscribers[user_id]
+            if not self.subscribers and not self._lock.locked():
+                self._stop()
+
+    def dispatch(self, payload: str):
+        event = orjson.loads(payload)
+        for subscription in self.subscribers.get(event.pop('user_id'), ()):
+            subscription.put(event)
+
+    def broadcast(self, event: dict):
+        for subscriptions in self.subscribers.values():
+            for subscription in subscriptions:
+                subscription.put(event)
+
+    async def _start(self):
+        ready = asyncio.get_running_loop().create_future()
+        self._listener = asyncio.create_task(self._listen(ready))
+        try:
+            await ready
+        except BaseException:
+            self._stop()
+            raise
+
+    def _stop(self):
+        listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.cancel()
+
+    async def _listen(self, ready: asyncio.Future):
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(
+                    self.conninfo, autocommit=True
+                ) as conn:
+                    await conn.execute(f'LISTEN {TODO_EVENTS_CHANNEL}')
+                    if ready.done():
+                        self.broadcast(RESET)
+                    else:
+                        ready.set_result(None)
+
+                    async for notify in conn.notifies():
+                        self.dispatch(notify.payload)
+            except psycopg.OperationalError as e:
+                if not ready.done():
+                    ready.set_exception(e)
+                    return
+
+                logger.warning('Lost the todo events connection: %s', e)
+                await asyncio.sleep(RECONNECT_SECONDS)
+
+
+todo_events = TodoEventBroker(
+    settings.DATABASE_URL, settings.TODO_EVENTS_QUEUE_SIZE
+)
+
+
+def get_todo_events():
+    return todo_events
@@ -0,0 +1,98 @@
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+
+EXPORT_FIELDS = (
+    'id',
+    'title',
+    'description',
+    'state',
+    'created_at',
+    'updated_at',
+)
+MEDIA_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def _plain(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def encode_ndjson(rows) -> bytes:
+    return b''.join(
+        json.dumps(
+            {field: _plain(value) for field, value in zip(EXPORT_FIELDS, row)},
+            separators=(',', ':'),
+        ).encode()
+        + b'\n'
+        for row in rows
+    )
+
+
+def encode_csv(rows, header: bool = False) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_FIELDS)
+    writer.writerows([_plain(value) for value in row] for row in rows)
+    return buffer.getvalue().encode()
+
+
+ENCODERS = {
+    'ndjson': encode_ndjson,
+    'csv': encode_csv,
+}
+
+
+def decode_ndjson(file):
+    for line_number, line in enumerate(file, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError:
+            yield line_number, None
+
+
+def decode_csv(file):
+    reader = csv.DictReader(
+        io.TextIOWrapper(file, encoding='utf-8', newline='')
+    )
+    for record in reader:
+        yield (
+            reader.line_num,
+            {
+                field: value
+                for field, value in record.items()
+                if field is not None and (value or field == 'description')
+            },
+        )
+
+
+COPY_ESCAPES = str.maketrans({
+    '\\': '\\\\',
+    '\t': '\\t',
+    '\n': '\\n',
+    '\r': '\\r',
+})
+
+
+def encode_copy(rows):
+    return ''.join(
+        '\t'.join(str(value).translate(COPY_ESCAPES) for value in row) + '\n'
+        for row in rows
+    ).encode()
+
+
+DECODERS = {
+    'ndjson': decode_ndjson,
+    'csv': decode_csv,
+}
@@ -0,0 +1,94 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+
+from pwdlib import PasswordHash
+
+pwd_context = PasswordHash.recommended()
+
+
+class HashingQueueFullError(Exception):
+    pass
+
+
+def hash_password(password: str):
+    return pwd_context.hash(password)
+
+
+def check_password(plain_password: str, hashed_password: str):
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+class HashingExecutor:
+    def __init__(
+        self,
+        kind: str = 'process',
+        workers: int | None = None,
+        queue_size: int = 64,
+    ):
+        self.kind = kind
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.in_flight = 0
+        self._executor = None
+
+    @property
+    def max_pending(self):
+        return self.workers + self.queue_size
+
+    @property
+    def queue_depth(self):
+        return max(0, self.in_flight - self.workers)
+
+    def _create_executor(self):
+        if self.kind == 'process':
+            try:
+                return ProcessPoolExecutor(
+                    self.workers, mp_context=get_context('spawn')
+                )
+            except (ImportError, NotImplementedError, OSError):
+                self.kind = 'thread'
+
+        return ThreadPoolExecutor(
+            self.workers, thread_name_prefix='password-hashing'
+        )
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = self._create_executor()
+        return self._executor
+
+    async def _submit(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        except BrokenProcessPool:
+            self.shutdown()
+            self.kind = 'thread'
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+
+    async def run(self, fn, *args):
+        if self.in_flight >= self.max_pending:
+            raise HashingQueueFullError
+
+        self.in_flight += 1
+        try:
+            return await self._submit(fn, *args)
+        finally:
+            self.in_flight -= 1
+
+    def stats(self):
+        return {
+            'kind': self.kind,
+            'workers': self.workers,
+            'max_pending': self.max_pending,
+            'in_flight': self.in_flight,
+            'queue_depth': self.queue_depth,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,86 @@
+import asyncio
+import logging
+from contextlib import suppress
+
+import orjson
+import psycopg
+
+from todo_list_api.cache import ResponseCache
+from todo_list_api.events import RECONNECT_SECONDS, conninfo
+from todo_list_api.models.todos import (
+    TODO_ARCHIVE_EVENTS_CHANNEL,
+    TODO_EVENTS_CHANNEL,
+)
+from todo_list_api.models.users import USER_EVENTS_CHANNEL
+from todo_list_api.replicas import ReplicaRouter, replica_router
+from todo_list_api.routers.todos import todo_cache
+from todo_list_api.security import token_versions
+from todo_list_api.settings import Settings
+
+logger = logging.getLogger('uvicorn.error')
+settings = Settings()
+
+
+class CacheInvalidator:
+    def __init__(
+        self,
+        database_url: str,
+        todos: ResponseCache,
+        router: ReplicaRouter,
+    ):
+        self.conninfo = conninfo(database_url)
+        self.todos = todos
+        self.router = router
+        self.listening = asyncio.Event()
+        self._listener: asyncio.Task | None = None
+
+    async def invalidate(self, channel: str, payload: str):
+        user_id = orjson.loads(payload)['user_id']
+        if channel == USER_EVENTS_CHANNEL:
+            token_versions.pop(user_id)
+        await self.todos.bump(user_id)
+        self.router.stick(user_id)
+
+    async def reset(self):
+        token_versions.clear()
+        await self.todos.clear()
+        self.router.stick_all()
+
+    def start(self):
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.cancel()
+            with suppress(asyncio.CancelledError):
+                await listener
+
+    async def _listen(self):
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(
+                    self.conninfo, autocommit=True
+                ) as conn:
+                    for channel in (
+                        TODO_EVENTS_CHANNEL,
+                        TODO_ARCHIVE_EVENTS_CHANNEL,
+                        USER_EVENTS_CHANNEL,
+                    ):
+                        await conn.execute(f'LISTEN {channel}')
+                    await self.reset()
+                    self.listening.set()
+
+                    async for notify in conn.notifies():
+                        await self.invalidate(notify.channel, notify.payload)
+            except psycopg.OperationalError as e:
+                self.listening.clear()
+                logger.warning('Lost the cache invalidation connection: %s', e)
+                await self.reset()
+                await asyncio.sleep(RECONNECT_SECONDS)
+
+
+cache_invalidator = CacheInvalidator(
+    settings.DATABASE_URL, todo_cache, replica_router
+)
@@ -0,0 +1,46 @@
+import asyncio
+from time import perf_counter
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from todo_list_api.settings import Settings
+
+
+async def current_revisions(database_url: str):
+    engine = create_async_engine(database_url, poolclass=NullPool)
+    try:
+        async with engine.connect() as conn:
+            return await conn.run_sync(
+                lambda sync_conn: set(
+                    MigrationContext.configure(sync_conn).get_current_heads()
+                )
+            )
+    finally:
+        await engine.dispose()
+
+
+def upgrade_if_needed(config: Config, database_url: str):
+    heads = set(ScriptDirectory.from_config(config).get_heads())
+    if asyncio.run(current_revisions(database_url)) == heads:
+        return False
+
+    command.upgrade(config, 'heads')
+    return True
+
+
+def main():
+    started = perf_counter()
+    upgraded = upgrade_if_needed(
+        Config('alembic.ini'), Settings().DATABASE_URL
+    )
+    state = 'upgraded to head' if upgraded else 'already at head'
+    print(f'database {state} in {(perf_counter() - started) * 1000:.0f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,17 @@
 from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import ForeignKey, func
+from sqlalchemy import DDL, Column, Computed, ForeignKey, Index, event, func
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column
 
 from .registry import table_registry
 
+SEARCH_CONFIG = 'english'
+TODO_EVENTS_CHANNEL = 'todo_events'
+TODO_ARCHIVE_EVENTS_CHANNEL = 'todo_archive_events'
+TODO_EVENTS_RESET_ROWS = 500
+
 
 class TodoState(str, Enum):
     draft = 'draft'
@@ -22,7 +28,9 @@ class Todo:
     id: Mapped[int] = mapped_column(init=False, primary_key=True)
     title: Mapped[str] = mapped_column(nullable=False)
     description: Mapped[str]
-    user_id: Mapped[int] = mapped_column(ForeignKey('users.id'))
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey('users.id', ondelete='CASCADE')
+    )
     state: Mapped[TodoState] = mapped_column(
         TodoState.draft, nullable=False, default=TodoState.draft
     )
@@ -32,3 +40,192 @@ class Todo:
     updated_at: Mapped[datetime] = mapped_column(
         init=False, server_default=func.now(), onupdate=func.now()
     )
+
+
+@table_registry.mapped_as_dataclass
+class TodoArchive:
+    __tablename__ = 'todos_archive'
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    title: Mapped[str] = mapped_column(nullable=False)
+    description: Mapped[str]
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey('users.id', ondelete='CASCADE')
+    )
+    state: Mapped[TodoState] = mapped_column(nullable=False)
+    created_at: Mapped[datetime]
+    updated_at: Mapped[datetime]
+    archived_at: Mapped[datetime] = mapped_column(
+        init=False, server_default=func.now()
+    )
+
+
+@table_registry.mapped_as_dataclass
+class TodoTombstone:
+    __tablename__ = 'todo_tombstones'
+
+    todo_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey('users.id', ondelete='CASCADE')
+    )
+    deleted_at: Mapped[datetime] = mapped_column(
+        init=False, server_default=func.now()
+    )
+
+
+todo_search_vector = Column(
+    'search_vector',
+    TSVECTOR,
+    Computed(
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', title), 'A') || "
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', "
+        "coalesce(description, '')), 'B')",
+        persisted=True,
+    ),
+)
+Todo.__table__.append_column(todo_search_vector)
+
+event.listen(
+    Todo.__table__,
+    'before_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm'),
+)
+
+NOTIFY_TODO_EVENTS = f"""
+CREATE OR REPLACE FUNCTION notify_todo_events() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    deleted integer;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        SELECT count(*) INTO deleted FROM old_rows
+        WHERE NOT EXISTS (
+            SELECT FROM todos_archive WHERE todos_archive.id = old_rows.id
+        );
+
+        IF deleted > {TODO_EVENTS_RESET_ROWS} THEN
+            PERFORM pg_notify(
+                '{TODO_EVENTS_CHANNEL}',
+                json_build_object('user_id', user_id, 'op', 'reset')::text
+            )
+            FROM old_rows
+            WHERE NOT EXISTS (
+                SELECT FROM todos_archive
+                WHERE todos_archive.id = old_rows.id
+            )
+            GROUP BY user_id;
+        ELSE
+            PERFORM pg_notify(
+                '{TODO_EVENTS_CHANNEL}',
+                json_build_object(
+                    'user_id', user_id, 'op', 'deleted', 'id', id
+                )::text
+            )
+            FROM old_rows
+            WHERE NOT EXISTS (
+                SELECT FROM todos_archive
+                WHERE todos_archive.id = old_rows.id
+            );
+        END IF;
+    ELSIF (SELECT count(*) FROM new_rows) > {TODO_EVENTS_RESET_ROWS} THEN
+        PERFORM pg_notify(
+            '{TODO_EVENTS_CHANNEL}',
+            json_build_object('user_id', user_id, 'op', 'reset')::text
+        )
+        FROM (SELECT DISTINCT user_id FROM new_rows) AS owners;
+    ELSE
+        PERFORM pg_notify(
+            '{TODO_EVENTS_CHANNEL}',
+            json_build_object(
+                'user_id', user_id,
+                'op', CASE TG_OP WHEN 'INSERT' THEN 'created'
+                    ELSE 'updated' END,
+                'todo', json_build_object(
+                    'id', id,
+                    'title', title,
+                    'description', description,
+                    'state', "TodoState.draft",
+                    'created_at', created_at,
+                    'updated_at', updated_at
+                )
+            )::text
+        )
+        FROM new_rows;
+    END IF;
+    RETURN NULL;
+END
+$$;
+
+CREATE TRIGGER todos_notify_insert AFTER INSERT ON todos
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notify_todo_events();
+
+CREATE TRIGGER todos_notify_update AFTER UPDATE ON todos
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notify_todo_events();
+
+CREATE TRIGGER todos_notify_delete AFTER DELETE ON todos
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notify_todo_events();
+"""
+
+NOTIFY_TODO_ARCHIVE_EVENTS = f"""
+CREATE OR REPLACE FUNCTION notify_todo_archive_events() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM pg_notify(
+        '{TODO_ARCHIVE_EVENTS_CHANNEL}',
+        json_build_object('user_id', user_id)::text
+    )
+    FROM (SELECT DISTINCT user_id FROM changed_rows) AS owners;
+    RETURN NULL;
+END
+$$;
+
+CREATE TRIGGER todos_archive_notify_insert AFTER INSERT ON todos_archive
+REFERENCING NEW TABLE AS changed_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notify_todo_archive_events();
+
+CREATE TRIGGER todos_archive_notify_delete AFTER DELETE ON todos_archive
+REFERENCING OLD TABLE AS changed_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notify_todo_archive_events();
+"""
+
+event.listen(Todo.__table__, 'after_create', DDL(NOTIFY_TODO_EVENTS))
+event.listen(
+    TodoArchive.__table__, 'after_create', DDL(NOTIFY_TODO_ARCHIVE_EVENTS)
+)
+
+Index('ix_todos_user_id_id', Todo.user_id, Todo.id)
+Index('ix_todos_user_id_state_id', Todo.user_id, Todo.state, Todo.id)
+Index('ix_todos_user_id_updated_at_id', Todo.user_id, Todo.updated_at, Todo.id)
+Index(
+    'ix_todos_archivable_updated_at',
+    Todo.updated_at,
+    postgresql_where=Todo.state.in_([TodoState.done, TodoState.trash]),
+)
+Index('ix_todos_archive_user_id_id', TodoArchive.user_id, TodoArchive.id)
+Index(
+    'ix_todos_archive_trash_updated_at',
+    TodoArchive.updated_at,
+    postgresql_where=TodoArchive.state == TodoState.trash,
+)
+Index(
+    'ix_todo_tombstones_user_id_deleted_at_todo_id',
+    TodoTombstone.user_id,
+    TodoTombstone.deleted_at,
+    TodoTombstone.todo_id,
+)
+Index(
+    'ix_todos_title_trgm',
+    Todo.title,
+    postgresql_using='gin',
+    postgresql_ops={'title': 'gin_trgm_ops'},
+)
+Index(
+    'ix_todos_description_trgm',
+    Todo.description,
+    postgresql_using='gin',
+    postgresql_ops={'description': 'gin_trgm_ops'},
+)
+Index('ix_todos_search_vector', todo_search_vector, postgresql_using='gin')
@@ -2,12 +2,14 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import func
+from sqlalchemy import DDL, event, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .registry import table_registry
 from .todos import Todo
 
+USER_EVENTS_CHANNEL = 'user_events'
+
 
 @table_registry.mapped_as_dataclass
 class User:
@@ -17,13 +19,46 @@ class User:
     username: Mapped[str] = mapped_column(unique=True)
     email: Mapped[str] = mapped_column(unique=True)
     password: Mapped[str]
+    token_version: Mapped[int] = mapped_column(
+        init=False, default=0, server_default='0'
+    )
     created_at: Mapped[datetime] = mapped_column(
         init=False, server_default=func.now()
     )
     updated_at: Mapped[datetime] = mapped_column(
         init=False, server_default=func.now(), onupdate=func.now()
     )
+    deleted_at: Mapped[datetime | None] = mapped_column(
+        init=False, default=None
+    )
 
     todos: Mapped[list[Todo]] = relationship(
-        init=False, cascade='all, delete-orphan', lazy='selectin'
+        init=False,
+        cascade='all, delete-orphan',
+        passive_deletes=True,
+        lazy='raise',
     )
+
+
+NOTIFY_USER_EVENTS = f"""
+CREATE OR REPLACE FUNCTION notify_user_events() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM pg_notify(
+        '{USER_EVENTS_CHANNEL}', json_build_object('user_id', id)::text
+    )
+    FROM changed_rows;
+    RETURN NULL;
+END
+$$;
+
+CREATE TRIGGER users_notify_update AFTER UPDATE ON users
+REFERENCING OLD TABLE AS changed_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notify_user_events();
+
+CREATE TRIGGER users_notify_delete AFTER DELETE ON users
+REFERENCING OLD TABLE AS changed_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notify_user_events();
+"""
+
+event.listen(User.__table__, 'after_create', DDL(NOTIFY_USER_EVENTS))
@@ -0,0 +1,67 @@
+import binascii
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from http import HTTPStatus
+
+from fastapi import HTTPException
+from sqlalchemy import Select, tuple_
+
+from todo_list_api.schemas.filters import FilterPage
+
+
+def _dump_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _load_value(column, value):
+    if column.type.python_type is datetime:
+        return datetime.fromisoformat(value)
+    return column.type.python_type(value)
+
+
+def encode_cursor(key: str, values: tuple):
+    payload = json.dumps(
+        {'k': key, 'v': [_dump_value(value) for value in values]},
+        separators=(',', ':'),
+    )
+    return urlsafe_b64encode(payload.encode()).rstrip(b'=').decode()
+
+
+def decode_cursor(cursor: str, key: str, columns: tuple):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(urlsafe_b64decode(padded))
+        values = payload['v']
+        if payload['k'] != key or len(values) != len(columns):
+            raise ValueError
+        return tuple(
+            _load_value(column, value)
+            for column, value in zip(columns, values)
+        )
+    except (ValueError, KeyError, TypeError, binascii.Error) as e:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST, detail='Invalid cursor'
+        ) from e
+
+
+def paginate(query: Select, columns: tuple, page: FilterPage, key: str):
+    if page.cursor:
+        values = decode_cursor(page.cursor, key, columns)
+        query = query.where(tuple_(*columns) > tuple_(*values))
+    else:
+        query = query.offset(page.offset)
+
+    return query.order_by(*columns).limit(page.limit + 1)
+
+
+def next_page(rows: list, columns: tuple, page: FilterPage, key: str):
+    if len(rows) <= page.limit or not page.limit:
+        return rows[: page.limit], None
+
+    rows = rows[: page.limit]
+    last = rows[-1]
+    cursor = encode_cursor(
+        key, tuple(getattr(last, column.key) for column in columns)
+    )
+    return rows, cursor
@@ -0,0 +1,153 @@
+import asyncio
+from datetime import timedelta
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from todo_list_api.database import engine, session_factory
+from todo_list_api.models.todos import (
+    Todo,
+    TodoArchive,
+    TodoState,
+    TodoTombstone,
+)
+from todo_list_api.models.users import User
+from todo_list_api.querybudget import capture_queries
+from todo_list_api.settings import Settings
+
+
+async def run_in_batches(
+    session_factory: async_sessionmaker, statement, batch_size: int
+):
+    total = 0
+    async with session_factory() as session:
+        while True:
+            result = await session.execute(
+                statement, execution_options={'preserve_rowcount': True}
+            )
+            await session.commit()
+            total += result.rowcount
+            if result.rowcount < batch_size:
+                return total
+
+
+async def purge_user(
+    session_factory: async_sessionmaker, user_id: int, batch_size: int
+):
+    with capture_queries():
+        for model in (Todo, TodoArchive):
+            batch = (
+                select(model.id)
+                .where(model.user_id == user_id)
+                .limit(batch_size)
+                .scalar_subquery()
+            )
+            await run_in_batches(
+                session_factory,
+                delete(model)
+                .where(model.id.in_(batch))
+                .execution_options(synchronize_session=False),
+                batch_size,
+            )
+
+        async with session_factory() as session:
+            await session.execute(
+                delete(User)
+                .where(User.id == user_id, User.deleted_at.is_not(None))
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+
+
+async def purge_deleted_users(
+    session_factory: async_sessionmaker, batch_size: int
+):
+    async with session_factory() as session:
+        user_ids = await session.scalars(
+            select(User.id)
+            .where(User.deleted_at.is_not(None))
+            .order_by(User.id)
+        )
+        user_ids = user_ids.all()
+
+    for user_id in user_ids:
+        await purge_user(session_factory, user_id, batch_size)
+
+    return len(user_ids)
+
+
+async def purge_tombstones(
+    session_factory: async_sessionmaker, retention_days: int, batch_size: int
+):
+    batch = (
+        select(TodoTombstone.todo_id)
+        .where(
+            TodoTombstone.deleted_at
+            < func.localtimestamp() - timedelta(days=retention_days)
+        )
+        .limit(batch_size)
+        .scalar_subquery()
+    )
+
+    return await run_in_batches(
+        session_factory,
+        delete(TodoTombstone)
+        .where(TodoTombstone.todo_id.in_(batch))
+        .execution_options(synchronize_session=False),
+        batch_size,
+    )
+
+
+async def purge_trash(
+    session_factory: async_sessionmaker, retention_days: int, batch_size: int
+):
+    batch = (
+        select(TodoArchive.id)
+        .where(
+            TodoArchive.state == TodoState.trash,
+            TodoArchive.updated_at
+            < func.localtimestamp() - timedelta(days=retention_days),
+        )
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    purged = (
+        delete(TodoArchive)
+        .where(TodoArchive.id.in_(batch))
+        .returning(TodoArchive.id, TodoArchive.user_id)
+        .cte()
+    )
+
+    return await run_in_batches(
+        session_factory,
+        insert(TodoTombstone).from_select(
+            ['todo_id', 'user_id'], select(purged.c.id, purged.c.user_id)
+        ),
+        batch_size,
+    )
+
+
+async def run():
+    settings = Settings()
+    try:
+        users = await purge_deleted_users(
+            session_factory, settings.PURGE_BATCH_SIZE
+        )
+        tombstones = await purge_tombstones(
+            session_factory,
+            settings.TODO_TOMBSTONE_RETENTION_DAYS,
+            settings.PURGE_BATCH_SIZE,
+        )
+    finally:
+        await engine.dispose()
+
+    print(f'purged {users} deleted users, {tombstones} expired tombstones')
+
+
+def main():
+    asyncio.run(run())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+import re
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from todo_list_api.settings import Settings
+from todo_list_api.telemetry import QueryLog, db_usage
+
+settings = Settings()
+budget_observers = []
+
+_PLACEHOLDER = re.compile(r'%\(\w+\)s|\$\d+|\b\d+\b')
+_WHITESPACE = re.compile(r'\s+')
+
+
+class QueryBudgetExceededError(AssertionError):
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class QueryBudget:
+    max_queries: int | None = None
+    max_repeats: int | None = settings.QUERY_REPEAT_LIMIT
+
+    def violations(self, log: QueryLog):
+        violations = []
+        if self.max_queries is not None and log.count > self.max_queries:
+            violations.append(
+                f'{log.count} queries exceed the budget of {self.max_queries}'
+            )
+
+        if self.max_repeats is not None:
+            shapes = Counter(map(statement_shape, log.statements))
+            violations.extend(
+                f'{count} repeats of {shape!r}'
+                for shape, count in shapes.items()
+                if count > self.max_repeats
+            )
+
+        return violations
+
+
+def statement_shape(statement: str):
+    return _WHITESPACE.sub(' ', _PLACEHOLDER.sub('?', statement)).strip()
+
+
+def query_budget(
+    max_queries: int | None,
+    max_repeats: int | None = settings.QUERY_REPEAT_LIMIT,
+):
+    def decorator(endpoint):
+        endpoint.query_budget = QueryBudget(max_queries, max_repeats)
+        return endpoint
+
+    return decorator
+
+
+@contextmanager
+def capture_queries():
+    log = QueryLog()
+    token = db_usage.set(log)
+    try:
+        yield log
+    finally:
+        db_usage.reset(token)
+
+
+@contextmanager
+def expect_queries(
+    max_queries: int | None,
+    max_repeats: int | None = settings.QUERY_REPEAT_LIMIT,
+):
+    with capture_queries() as log:
+        yield log
+
+    if violations := QueryBudget(max_queries, max_repeats).violations(log):
+        raise QueryBudgetExceededError('; '.join(violations))
+
+
+class QueryBudgetMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        log = db_usage.get()
+        token = None
+        if log is None:
+            log = QueryLog()
+            token = db_usage.set(log)
+
+        async def send_with_usage(message):
+            if message['type'] == 'http.response.start' and settings.DEBUG:
+                message['headers'] = [
+                    *message.get('headers', []),
+                    (b'x-db-queries', str(log.count).encode()),
+                    (b'x-db-time', f'{log.seconds * 1000:.3f}'.encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_usage)
+        finally:
+            if token is not None:
+                db_usage.reset(token)
+
+        if budget_observers and (route := scope.get('route')) is not None:
+            budget = getattr(route.endpoint, 'query_budget', QueryBudget())
+            if violations := budget.violations(log):
+                for observer in budget_observers:
+                    observer(route.path, violations)
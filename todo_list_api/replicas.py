@@ -0,0 +1,108 @@
+from itertools import count
+from time import monotonic
+
+from fastapi import Depends
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+)
+
+from todo_list_api.cache import TTLCache
+from todo_list_api.database import create_engine_from_settings, engine
+from todo_list_api.security import Principal, get_current_user
+from todo_list_api.settings import Settings
+
+STICKY_USERS_SIZE = 10_000
+
+
+class ReplicaRouter:
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: list[AsyncEngine],
+        eject_seconds: float,
+        sticky_seconds: float,
+    ):
+        self.primary = primary.execution_options(postgresql_readonly=True)
+        self.replicas = [
+            replica.execution_options(postgresql_readonly=True)
+            for replica in replicas
+        ]
+        self.eject_seconds = eject_seconds
+        self._turn = count()
+        self._ejected_until: dict[int, float] = {}
+        self._sticky = TTLCache(maxsize=STICKY_USERS_SIZE, ttl=sticky_seconds)
+        self._sticky_all_until = 0.0
+
+    def pick(self, user_id: int | None = None):
+        now = monotonic()
+        if self._sticky_all_until > now:
+            return self.primary
+        if user_id is not None and self._sticky.get(user_id):
+            return self.primary
+
+        for _ in self.replicas:
+            index = next(self._turn) % len(self.replicas)
+            if self._ejected_until.get(index, 0) <= now:
+                return self.replicas[index]
+
+        return self.primary
+
+    def eject(self, replica: AsyncEngine):
+        index = self.replicas.index(replica)
+        self._ejected_until[index] = monotonic() + self.eject_seconds
+
+    def stick(self, user_id: int):
+        self._sticky.set(user_id, True)
+
+    def stick_all(self):
+        self._sticky_all_until = monotonic() + self._sticky.ttl
+
+    async def pick_healthy(self, user_id: int | None = None):
+        target = self.pick(user_id)
+        if target is self.primary:
+            return target
+
+        try:
+            async with target.connect():
+                pass
+        except DBAPIError:
+            self.eject(target)
+            return self.primary
+
+        return target
+
+    async def open_session(self, user_id: int | None = None):
+        return AsyncSession(
+            await self.pick_healthy(user_id), expire_on_commit=False
+        )
+
+
+settings = Settings()
+replica_router = ReplicaRouter(
+    engine,
+    [
+        create_engine_from_settings(settings, url)
+        for url in settings.DATABASE_REPLICA_URLS
+    ],
+    eject_seconds=settings.REPLICA_EJECT_SECONDS,
+    sticky_seconds=settings.READ_YOUR_WRITES_SECONDS,
+)
+
+
+async def get_read_session(  # pragma: no cover
+    current_user: Principal = Depends(get_current_user),
+):
+    async with await replica_router.open_session(current_user.id) as session:
+        yield session
+
+
+async def get_read_session_factory(  # pragma: no cover
+    current_user: Principal = Depends(get_current_user),
+):
+    return async_sessionmaker(
+        await replica_router.pick_healthy(current_user.id),
+        expire_on_commit=False,
+    )
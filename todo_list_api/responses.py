@@ -0,0 +1,59 @@
+from datetime import datetime
+from functools import partial
+
+import orjson
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+JSON_MEDIA_TYPE = 'application/json'
+MSGPACK_MEDIA_TYPES = ('application/msgpack', 'application/x-msgpack')
+
+
+def _msgpack_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f'Cannot serialize {type(value).__name__}')
+
+
+RESPONSE_ENCODERS = {JSON_MEDIA_TYPE: orjson.dumps}
+if msgpack is not None:
+    RESPONSE_ENCODERS.update(
+        dict.fromkeys(
+            MSGPACK_MEDIA_TYPES,
+            partial(msgpack.packb, default=_msgpack_default),
+        )
+    )
+
+
+def _quality(params: list[str]):
+    for param in params:
+        name, _, value = param.partition('=')
+        if name.strip().lower() == 'q':
+            try:
+                return float(value)
+            except ValueError:
+                return 0.0
+
+    return 1.0
+
+
+def negotiate(accept: str | None):
+    best, best_quality = JSON_MEDIA_TYPE, 0.0
+    for media_range in (accept or '').split(','):
+        media_type, *params = media_range.split(';')
+        media_type = media_type.strip().lower()
+        if media_type in {'*/*', 'application/*'}:
+            media_type = JSON_MEDIA_TYPE
+
+        quality = _quality(params)
+        if media_type in RESPONSE_ENCODERS and quality > best_quality:
+            best, best_quality = media_type, quality
+
+    return best
+
+
+def encode(content, media_type: str):
+    return RESPONSE_ENCODERS[media_type](content)
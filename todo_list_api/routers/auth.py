@@ -8,9 +8,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from todo_list_api.database import get_session
 from todo_list_api.models.users import User
+from todo_list_api.querybudget import query_budget
 from todo_list_api.schemas.auth import TokenResponse
 from todo_list_api.security import (
-    create_access_token,
+    Principal,
+    create_user_token,
     get_current_user,
     verify_password,
 )
@@ -19,16 +21,19 @@ router = APIRouter(prefix='/api/v1/auth', tags=['auth'])
 
 Session = Annotated[AsyncSession, Depends(get_session)]
 OAuthForm = Annotated[OAuth2PasswordRequestForm, Depends()]
-CurrentUser = Annotated[User, Depends(get_current_user)]
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
 
 
 @router.post('/token', response_model=TokenResponse)
+@query_budget(1)
 async def login_for_access_token(
     form_data: OAuthForm,
     session: Session,
 ):
     user_db = await session.scalar(
-        select(User).where(User.email == form_data.username)
+        select(User).where(
+            User.email == form_data.username, User.deleted_at.is_(None)
+        )
     )
 
     if not user_db:
@@ -37,18 +42,19 @@ async def login_for_access_token(
             detail='Email doesnt exists!',
         )
 
-    if not verify_password(form_data.password, user_db.password):
+    if not await verify_password(form_data.password, user_db.password):
         raise HTTPException(
             status_code=HTTPStatus.UNAUTHORIZED,
             detail='Incorrect password!',
         )
 
-    access_token = create_access_token({'sub': user_db.email})
+    access_token = create_user_token(user_db)
 
     return {'access_token': access_token, 'token_type': 'Bearer'}
 
 
 @router.post('/refresh_token', response_model=TokenResponse)
+@query_budget(1)
 async def refresh_access_token(user: CurrentUser):
-    new_access_token = create_access_token(data={'sub': user.email})
+    new_access_token = create_user_token(user)
     return {'access_token': new_access_token, 'token_type': 'Bearer'}
@@ -0,0 +1,61 @@
+from hmac import compare_digest
+from http import HTTPStatus
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from todo_list_api.database import engine
+from todo_list_api.querybudget import query_budget
+from todo_list_api.schemas.internal import (
+    HashingStatsResponse,
+    PoolStatsResponse,
+)
+from todo_list_api.security import hashing_executor
+from todo_list_api.settings import Settings
+
+settings = Settings()
+internal_scheme = HTTPBearer(auto_error=False)
+
+
+def verify_internal_token(
+    credentials: HTTPAuthorizationCredentials | None = Depends(
+        internal_scheme
+    ),
+):
+    if not settings.INTERNAL_TOKEN:
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND)
+    if credentials is None or not compare_digest(
+        credentials.credentials, settings.INTERNAL_TOKEN
+    ):
+        raise HTTPException(
+            status_code=HTTPStatus.UNAUTHORIZED,
+            detail='Could not validate credentials',
+            headers={'WWW-Authenticate': 'Bearer'},
+        )
+
+
+router = APIRouter(
+    prefix='/internal',
+    tags=['internal'],
+    dependencies=[Depends(verify_internal_token)],
+)
+
+
+@router.get(
+    '/hashing',
+    status_code=HTTPStatus.OK,
+    response_model=HashingStatsResponse,
+)
+@query_budget(0)
+async def read_hashing_stats():
+    return hashing_executor.stats()
+
+
+@router.get(
+    '/pool',
+    status_code=HTTPStatus.OK,
+    response_model=PoolStatsResponse,
+)
+@query_budget(0)
+async def read_pool_stats():
+    return engine.pool.stats()
@@ -1,27 +1,270 @@
+import asyncio
+from datetime import datetime, timedelta
+from hashlib import blake2b
 from http import HTTPStatus
+from itertools import islice
+from operator import itemgetter
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+import orjson
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from psycopg import sql
+from pydantic import ValidationError
+from sqlalchemy import (
+    Integer,
+    String,
+    any_,
+    cast,
+    column,
+    delete,
+    func,
+    insert,
+    literal,
+    null,
+    select,
+    tuple_,
+    union_all,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import (
+    ARRAY,
+    DOUBLE_PRECISION,
+    ts_headline,
+    websearch_to_tsquery,
+)
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from todo_list_api.database import get_session
-from todo_list_api.models.todos import Todo
-from todo_list_api.models.users import User
-from todo_list_api.schemas.filters import FilterTodo
+from todo_list_api.archive import ARCHIVED_KEYS
+from todo_list_api.cache import (
+    MemoryResponseCache,
+    ResponseCache,
+    etag_matches,
+    make_etag,
+)
+from todo_list_api.database import get_session, get_session_factory
+from todo_list_api.events import TodoEventBroker, get_todo_events
+from todo_list_api.formats import (
+    DECODERS,
+    ENCODERS,
+    MEDIA_TYPES,
+    encode_copy,
+    encode_csv,
+)
+from todo_list_api.models.todos import (
+    SEARCH_CONFIG,
+    Todo,
+    TodoArchive,
+    TodoTombstone,
+    todo_search_vector,
+)
+from todo_list_api.pagination import (
+    decode_cursor,
+    encode_cursor,
+    next_page,
+    paginate,
+)
+from todo_list_api.querybudget import query_budget
+from todo_list_api.replicas import (
+    get_read_session,
+    get_read_session_factory,
+    replica_router,
+)
+from todo_list_api.responses import encode, negotiate
+from todo_list_api.schemas.filters import (
+    FilterChanges,
+    FilterExport,
+    FilterSearch,
+    FilterTodo,
+    FilterTodoFields,
+)
 from todo_list_api.schemas.todos import (
+    TodoBulkRequest,
+    TodoBulkResponse,
+    TodoChangesResponse,
     TodoCreate,
+    TodoImportOptions,
+    TodoImportResponse,
     TodoResponse,
     TodoResponseList,
+    TodoSearchResponseList,
     TodoUpdate,
 )
-from todo_list_api.security import get_current_user
+from todo_list_api.security import (
+    Principal,
+    get_current_user,
+    oauth2_scheme,
+)
+from todo_list_api.settings import Settings
 
 router = APIRouter(prefix='/api/v1/todos', tags=['todos'])
+settings = Settings()
+todo_cache = MemoryResponseCache(
+    maxsize=settings.TODO_CACHE_SIZE,
+    ttl=settings.TODO_CACHE_SECONDS,
+)
+
+
+def get_todo_cache():
+    return todo_cache
+
 
 Session = Annotated[AsyncSession, Depends(get_session)]
-CurrentUser = Annotated[User, Depends(get_current_user)]
+ReadSession = Annotated[AsyncSession, Depends(get_read_session)]
+SessionFactory = Annotated[async_sessionmaker, Depends(get_session_factory)]
+ReadSessionFactory = Annotated[
+    async_sessionmaker, Depends(get_read_session_factory)
+]
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
+Token = Annotated[str, Depends(oauth2_scheme)]
 Filter = Annotated[FilterTodo, Query()]
+Changes = Annotated[FilterChanges, Query()]
+Search = Annotated[FilterSearch, Query()]
+Export = Annotated[FilterExport, Query()]
+ImportOptions = Annotated[TodoImportOptions, Query()]
+Cache = Annotated[ResponseCache, Depends(get_todo_cache)]
+Events = Annotated[TodoEventBroker, Depends(get_todo_events)]
+
+TODO_COLUMNS = (
+    Todo.id,
+    Todo.title,
+    Todo.description,
+    Todo.state,
+    Todo.created_at,
+    Todo.updated_at,
+)
+TODO_ORDERINGS = {
+    'id': (Todo.id,),
+    'created_at': (Todo.created_at, Todo.id),
+    'updated_at': (Todo.updated_at, Todo.id),
+}
+COPY_TODOS = sql.SQL('COPY {table} ({columns}) FROM STDIN').format(
+    table=sql.Identifier(Todo.__tablename__),
+    columns=sql.SQL(', ').join(
+        sql.Identifier(Todo.__mapper__.columns[key].name)
+        for key in ('user_id', 'title', 'description', 'state')
+    ),
+)
+CHANGES_KEY = 'changes'
+CHANGES_COLUMNS = (Todo.updated_at, Todo.id)
+HEADLINE_OPTIONS = (
+    'StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15, '
+    'MaxFragments=2'
+)
+
+
+def _contains_pattern(value: str):
+    escaped = (
+        value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    )
+    return f'%{escaped}%'
+
+
+def filter_todos(user_id: int, filters: FilterTodoFields, model=Todo):
+    query = select(model).where(model.user_id == user_id)
+
+    filter_data = filters.model_dump(
+        exclude_unset=True,
+        exclude={
+            'limit',
+            'offset',
+            'cursor',
+            'order_by',
+            'format',
+            'include_archived',
+        },
+    )
+
+    for field_name, field_value in filter_data.items():
+        if hasattr(model, field_name):
+            column = getattr(model, field_name)
+
+            if field_name in {'title', 'description'}:
+                query = query.filter(
+                    column.like(_contains_pattern(field_value), escape='\\')
+                )
+            else:
+                query = query.filter(column == field_value)
+
+    return query
+
+
+def delete_todos(*where, model=Todo):
+    deleted = (
+        delete(model).where(*where).returning(model.id, model.user_id).cte()
+    )
+    return (
+        insert(TodoTombstone)
+        .from_select(
+            ['todo_id', 'user_id'], select(deleted.c.id, deleted.c.user_id)
+        )
+        .returning(TodoTombstone.todo_id)
+    )
+
+
+def restore_todos(user_id: int, todo_ids: list[int], patch: dict):
+    restored = (
+        delete(TodoArchive)
+        .where(
+            TodoArchive.id == any_(literal(todo_ids, ARRAY(Integer))),
+            TodoArchive.user_id == user_id,
+        )
+        .returning(*(getattr(TodoArchive, key) for key in ARCHIVED_KEYS))
+        .cte()
+    )
+    values = {
+        key: literal(patch[key], getattr(Todo, key).type)
+        if key in patch
+        else restored.c[key]
+        for key in ARCHIVED_KEYS
+    } | {'updated_at': func.now()}
+
+    return (
+        insert(Todo)
+        .from_select(
+            [getattr(Todo, key) for key in values],
+            select(*values.values()),
+        )
+        .returning(*TODO_COLUMNS)
+    )
+
+
+def select_todos(user_id: int, filters: FilterTodoFields):
+    query = filter_todos(user_id, filters).with_only_columns(*TODO_COLUMNS)
+    if not filters.include_archived:
+        return query, Todo
+
+    archived = filter_todos(user_id, filters, TodoArchive).with_only_columns(
+        *(getattr(TodoArchive, column.key) for column in TODO_COLUMNS)
+    )
+    todos = union_all(query, archived).subquery('all_todos')
+    return select(todos), todos.c
+
+
+def list_todos_query(user_id: int, filters: FilterTodo):
+    query, source = select_todos(user_id, filters)
+    return paginate(
+        query,
+        tuple(
+            getattr(source, column.key)
+            for column in TODO_ORDERINGS[filters.order_by]
+        ),
+        filters,
+        key=filters.order_by,
+    )
 
 
 @router.post(
@@ -29,10 +272,12 @@ Filter = Annotated[FilterTodo, Query()]
     response_model=TodoResponse,
     status_code=HTTPStatus.CREATED,
 )
+@query_budget(2)
 async def create_todo(
     todo: TodoCreate,
     session: Session,
     current_user: CurrentUser,
+    cache: Cache,
 ):
     todo_db = Todo(
         user_id=current_user.id,
@@ -43,39 +288,584 @@ async def create_todo(
 
     session.add(todo_db)
     await session.commit()
-    await session.refresh(todo_db)
+    await cache.bump(current_user.id)
+    replica_router.stick(current_user.id)
 
     return todo_db
 
 
+async def _bulk_create(session: AsyncSession, user_id: int, operations):
+    if not operations:
+        return []
+
+    rows = await session.execute(
+        insert(Todo).returning(*TODO_COLUMNS, sort_by_parameter_order=True),
+        [
+            {'user_id': user_id, **operation.model_dump(exclude={'op'})}
+            for _, operation in operations
+        ],
+    )
+
+    return [
+        {
+            'index': index,
+            'op': 'create',
+            'status': HTTPStatus.CREATED,
+            'id': row.id,
+            'todo': row._asdict(),
+        }
+        for (index, _), row in zip(operations, rows)
+    ]
+
+
+def _patch_todos(user_id: int, operations):
+    patch = values(
+        column('id', Integer),
+        column('title', String),
+        column('description', String),
+        column('state', String),
+        name='patch',
+    ).data([
+        (operation.id, operation.title, operation.description, operation.state)
+        for _, operation in operations
+    ])
+    return (
+        update(Todo)
+        .where(Todo.id == patch.c.id, Todo.user_id == user_id)
+        .values(
+            title=func.coalesce(patch.c.title, Todo.title),
+            description=func.coalesce(patch.c.description, Todo.description),
+            state=func.coalesce(
+                cast(patch.c.state, Todo.state.type), Todo.state
+            ),
+        )
+        .returning(*TODO_COLUMNS)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def _bulk_update(session: AsyncSession, user_id: int, operations):
+    if not operations:
+        return []
+
+    rows = await session.execute(_patch_todos(user_id, operations))
+    updated = {row.id: row._asdict() for row in rows}
+    if missing := [
+        (index, operation)
+        for index, operation in operations
+        if operation.id not in updated
+    ]:
+        restored = set(
+            await session.scalars(
+                restore_todos(
+                    user_id, [operation.id for _, operation in missing], {}
+                )
+            )
+        )
+        if restored:
+            rows = await session.execute(
+                _patch_todos(
+                    user_id,
+                    [
+                        (index, operation)
+                        for index, operation in missing
+                        if operation.id in restored
+                    ],
+                )
+            )
+            updated.update((row.id, row._asdict()) for row in rows)
+
+    return [
+        {
+            'index': index,
+            'op': 'update',
+            'status': HTTPStatus.OK,
+            'id': operation.id,
+            'todo': updated[operation.id],
+        }
+        if operation.id in updated
+        else _bulk_not_found(index, operation)
+        for index, operation in operations
+    ]
+
+
+async def _bulk_delete(session: AsyncSession, user_id: int, operations):
+    if not operations:
+        return []
+
+    todo_ids = [operation.id for _, operation in operations]
+    deleted = set(
+        await session.scalars(
+            delete_todos(
+                Todo.id == any_(literal(todo_ids, ARRAY(Integer))),
+                Todo.user_id == user_id,
+            )
+        )
+    )
+    if archived_ids := set(todo_ids) - deleted:
+        deleted.update(
+            await session.scalars(
+                delete_todos(
+                    TodoArchive.id
+                    == any_(literal(list(archived_ids), ARRAY(Integer))),
+                    TodoArchive.user_id == user_id,
+                    model=TodoArchive,
+                )
+            )
+        )
+
+    return [
+        {
+            'index': index,
+            'op': 'delete',
+            'status': HTTPStatus.NO_CONTENT,
+            'id': operation.id,
+        }
+        if operation.id in deleted
+        else _bulk_not_found(index, operation)
+        for index, operation in operations
+    ]
+
+
+def _bulk_not_found(index: int, operation):
+    return {
+        'index': index,
+        'op': operation.op,
+        'status': HTTPStatus.NOT_FOUND,
+        'id': operation.id,
+        'detail': 'Task dont exists',
+    }
+
+
+@router.post(
+    '/bulk',
+    response_model=TodoBulkResponse,
+    status_code=HTTPStatus.OK,
+)
+@query_budget(7)
+async def bulk_todos(
+    bulk: TodoBulkRequest,
+    session: Session,
+    current_user: CurrentUser,
+    cache: Cache,
+):
+    if len(bulk.operations) > settings.BULK_MAX_OPERATIONS:
+        raise HTTPException(
+            status_code=HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+            detail=(
+                f'Bulk requests accept at most '
+                f'{settings.BULK_MAX_OPERATIONS} operations'
+            ),
+        )
+
+    grouped = {'create': [], 'update': [], 'delete': []}
+    for index, operation in enumerate(bulk.operations):
+        grouped[operation.op].append((index, operation))
+
+    results = [
+        *await _bulk_create(session, current_user.id, grouped['create']),
+        *await _bulk_update(session, current_user.id, grouped['update']),
+        *await _bulk_delete(session, current_user.id, grouped['delete']),
+    ]
+    await session.commit()
+    await cache.bump(current_user.id)
+    replica_router.stick(current_user.id)
+
+    return {'results': sorted(results, key=itemgetter('index'))}
+
+
 @router.get(
     '/',
     response_model=TodoResponseList,
     status_code=HTTPStatus.OK,
 )
+@query_budget(2)
 async def read_todos(
-    session: Session, current_user: CurrentUser, filters: Filter
+    request: Request,
+    session: ReadSession,
+    current_user: CurrentUser,
+    filters: Filter,
+    cache: Cache,
 ):
-    query = select(Todo).where(Todo.user_id == current_user.id)
+    media_type = negotiate(request.headers.get('Accept'))
+    generation = await cache.generation(current_user.id)
+    cache_key = (
+        f'todos:{current_user.id}:{generation}:{media_type}:'
+        f'{filters.model_dump_json()}'
+    )
 
-    filter_data = filters.model_dump(
-        exclude_unset=True, exclude={'limit', 'offset'}
+    cached = await cache.get(cache_key)
+    if cached is None:
+        rows = await session.execute(
+            list_todos_query(current_user.id, filters)
+        )
+        rows, next_cursor = next_page(
+            rows.all(),
+            TODO_ORDERINGS[filters.order_by],
+            filters,
+            key=filters.order_by,
+        )
+
+        body = encode(
+            {
+                'todos': [row._asdict() for row in rows],
+                'next_cursor': next_cursor,
+            },
+            media_type,
+        )
+        cached = (body, make_etag(body))
+        await cache.set(cache_key, cached)
+
+    body, etag = cached
+    headers = {
+        'ETag': etag,
+        'Cache-Control': 'private, no-cache',
+        'Vary': 'Accept',
+    }
+    if etag_matches(request.headers.get('If-None-Match'), etag):
+        return Response(status_code=HTTPStatus.NOT_MODIFIED, headers=headers)
+
+    return Response(body, media_type=media_type, headers=headers)
+
+
+def changes_query(
+    user_id: int, since: tuple | None, until: datetime, limit: int
+):
+    todos = select(*TODO_COLUMNS, literal(False).label('deleted')).where(
+        Todo.user_id == user_id, Todo.updated_at <= until
     )
+    if since is None:
+        return todos.order_by(*CHANGES_COLUMNS).limit(limit)
 
-    for field_name, field_value in filter_data.items():
-        if hasattr(Todo, field_name):
-            column = getattr(Todo, field_name)
+    tombstones = select(
+        TodoTombstone.todo_id,
+        null(),
+        null(),
+        null(),
+        null(),
+        TodoTombstone.deleted_at,
+        literal(True),
+    ).where(
+        TodoTombstone.user_id == user_id,
+        tuple_(TodoTombstone.deleted_at, TodoTombstone.todo_id)
+        > tuple_(*since),
+        TodoTombstone.deleted_at <= until,
+    )
+    changes = union_all(
+        todos.where(tuple_(*CHANGES_COLUMNS) > tuple_(*since))
+        .order_by(*CHANGES_COLUMNS)
+        .limit(limit),
+        tombstones.order_by(
+            TodoTombstone.deleted_at, TodoTombstone.todo_id
+        ).limit(limit),
+    ).subquery()
 
-            if field_name in {'title', 'description'}:
-                query = query.filter(column.contains(field_value))
+    return (
+        select(changes)
+        .order_by(changes.c.updated_at, changes.c.id)
+        .limit(limit)
+    )
+
+
+@router.get(
+    '/changes',
+    response_model=TodoChangesResponse,
+    status_code=HTTPStatus.OK,
+)
+@query_budget(3)
+async def read_todo_changes(
+    session: Session, current_user: CurrentUser, filters: Changes
+):
+    now = await session.scalar(select(func.localtimestamp()))
+    since = None
+    if filters.since:
+        since = decode_cursor(filters.since, CHANGES_KEY, CHANGES_COLUMNS)
+        retention = timedelta(days=settings.TODO_TOMBSTONE_RETENTION_DAYS)
+        if since[0] < now - retention:
+            raise HTTPException(
+                status_code=HTTPStatus.GONE,
+                detail='Watermark expired, sync again without since',
+            )
+
+    until = now - timedelta(seconds=settings.TODO_SYNC_LAG_SECONDS)
+    rows = (
+        await session.execute(
+            changes_query(current_user.id, since, until, filters.limit + 1)
+        )
+    ).all()
+    has_more = len(rows) > filters.limit
+    rows = rows[: filters.limit]
+
+    if has_more:
+        watermark = (rows[-1].updated_at, rows[-1].id)
+    else:
+        watermark = max(since or (), (until, 0))
+
+    return {
+        'todos': [row._asdict() for row in rows if not row.deleted],
+        'deleted': [row.id for row in rows if row.deleted],
+        'watermark': encode_cursor(CHANGES_KEY, watermark),
+        'has_more': has_more,
+    }
+
+
+@router.get(
+    '/search',
+    response_model=TodoSearchResponseList,
+    status_code=HTTPStatus.OK,
+)
+@query_budget(2)
+async def search_todos(
+    session: ReadSession, current_user: CurrentUser, filters: Search
+):
+    ts_query = websearch_to_tsquery(SEARCH_CONFIG, filters.q)
+    rank = cast(
+        func.ts_rank_cd(todo_search_vector, ts_query), DOUBLE_PRECISION
+    )
+    sort_rank = (-rank).label('sort_rank')
+    columns = (sort_rank, Todo.id)
+    cursor_key = (
+        'rank:' + blake2b(filters.q.encode(), digest_size=8).hexdigest()
+    )
+
+    query = select(
+        *TODO_COLUMNS,
+        sort_rank,
+        rank.label('rank'),
+        ts_headline(
+            SEARCH_CONFIG, Todo.title, ts_query, HEADLINE_OPTIONS
+        ).label('title_highlight'),
+        ts_headline(
+            SEARCH_CONFIG, Todo.description, ts_query, HEADLINE_OPTIONS
+        ).label('description_highlight'),
+    ).where(
+        Todo.user_id == current_user.id,
+        todo_search_vector.bool_op('@@')(ts_query),
+    )
+
+    rows = await session.execute(
+        paginate(query, columns, filters, key=cursor_key)
+    )
+    rows, next_cursor = next_page(rows.all(), columns, filters, key=cursor_key)
+
+    return {
+        'results': [row._asdict() for row in rows],
+        'next_cursor': next_cursor,
+    }
+
+
+async def _stream_todos(factory: async_sessionmaker, query, export_format):
+    async with factory() as session:
+        result = await session.stream(
+            query.execution_options(yield_per=settings.EXPORT_FETCH_SIZE)
+        )
+        if export_format == 'csv':
+            yield encode_csv([], header=True)
+
+        encode = ENCODERS[export_format]
+        async for rows in result.partitions():
+            yield encode(rows)
+
+
+@router.get(
+    '/export',
+    response_class=StreamingResponse,
+    status_code=HTTPStatus.OK,
+)
+@query_budget(2)
+async def export_todos(
+    current_user: CurrentUser,
+    filters: Export,
+    factory: ReadSessionFactory,
+):
+    query, source = select_todos(current_user.id, filters)
+    query = query.order_by(source.id)
+
+    return StreamingResponse(
+        _stream_todos(factory, query, filters.format),
+        media_type=MEDIA_TYPES[filters.format],
+        headers={
+            'Content-Disposition': (
+                f'attachment; filename="todos.{filters.format}"'
+            )
+        },
+    )
+
+
+async def _authenticate(factory: async_sessionmaker, token: str):
+    async with factory() as session:
+        return await get_current_user(session, token)
+
+
+async def _next_event(subscription):
+    try:
+        return await asyncio.wait_for(
+            subscription.get(), settings.TODO_EVENTS_KEEPALIVE_SECONDS
+        )
+    except TimeoutError:
+        return None
+
+
+def format_sse(event: dict | None):
+    if event is None:
+        return b': keep-alive\n\n'
+
+    return b'event: %s\ndata: %s\n\n' % (
+        event['op'].encode(),
+        orjson.dumps(event),
+    )
+
+
+async def _sse_events(events: TodoEventBroker, user_id: int):
+    async with events.subscribe(user_id) as subscription:
+        yield format_sse(None)
+        while True:
+            yield format_sse(await _next_event(subscription))
+
+
+@router.get(
+    '/stream',
+    response_class=StreamingResponse,
+    status_code=HTTPStatus.OK,
+)
+@query_budget(1)
+async def stream_todos(token: Token, factory: SessionFactory, events: Events):
+    current_user = await _authenticate(factory, token)
+
+    return StreamingResponse(
+        _sse_events(events, current_user.id),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+
+async def _send_events(websocket: WebSocket, subscription):
+    while True:
+        event = await _next_event(subscription)
+        await websocket.send_json(event or {'op': 'ping'})
+
+
+@router.websocket('/stream')
+async def stream_todos_websocket(
+    websocket: WebSocket,
+    factory: SessionFactory,
+    events: Events,
+    token: str | None = None,
+):
+    authorization = websocket.headers.get('Authorization', '')
+    try:
+        current_user = await _authenticate(
+            factory, token or authorization.removeprefix('Bearer ')
+        )
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    async with events.subscribe(current_user.id) as subscription:
+        await websocket.accept()
+        sender = asyncio.create_task(_send_events(websocket, subscription))
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            pass
+        finally:
+            sender.cancel()
+
+
+def _validation_detail(error: ValidationError):
+    return '; '.join(
+        f'{".".join(map(str, detail["loc"])) or "row"}: {detail["msg"]}'
+        for detail in error.errors()
+    )
+
+
+def _import_rows(records, user_id: int, report: dict):
+    for line_number, record in records:
+        if record is None:
+            detail = 'Invalid JSON'
+        else:
+            try:
+                todo = TodoCreate.model_validate(record)
+            except ValidationError as e:
+                detail = _validation_detail(e)
             else:
-                query = query.filter(column == field_value)
+                yield (
+                    user_id,
+                    todo.title,
+                    todo.description or '',
+                    todo.state.value,
+                )
+                continue
+
+        report['failed'] += 1
+        if len(report['errors']) < settings.IMPORT_MAX_ERRORS:
+            report['errors'].append({'line': line_number, 'detail': detail})
+
+
+async def _copy_todos(session: AsyncSession, rows: list):
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    async with raw_connection.driver_connection.cursor() as cursor:
+        async with cursor.copy(COPY_TODOS) as copy:
+            await copy.write(encode_copy(rows))
+
+    return len(rows)
 
-    todos = await session.scalars(
-        query.limit(filters.limit).offset(filters.offset)
+
+@router.post(
+    '/import',
+    response_model=TodoImportResponse,
+    status_code=HTTPStatus.CREATED,
+)
+@query_budget(1)
+async def import_todos(
+    file: UploadFile,
+    options: ImportOptions,
+    session: Session,
+    current_user: CurrentUser,
+    cache: Cache,
+):
+    import_format = options.format or (
+        'csv' if (file.filename or '').endswith('.csv') else 'ndjson'
     )
+    atomic = options.mode == 'atomic'
+    report = {'imported': 0, 'failed': 0, 'errors': []}
+    rows = _import_rows(
+        DECODERS[import_format](file.file), current_user.id, report
+    )
+
+    try:
+        while chunk := await run_in_threadpool(
+            list, islice(rows, settings.IMPORT_CHUNK_SIZE)
+        ):
+            if not (atomic and report['failed']):
+                report['imported'] += await _copy_todos(session, chunk)
+    except UnicodeDecodeError as e:
+        await session.rollback()
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail='File must be UTF-8 encoded',
+        ) from e
 
-    return {'todos': todos.all()}
+    if atomic and report['failed']:
+        await session.rollback()
+        raise HTTPException(
+            status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+            detail={**report, 'imported': 0},
+        )
+
+    await session.commit()
+    await cache.bump(current_user.id)
+    replica_router.stick(current_user.id)
+
+    return report
+
+
+def _todo_not_found():
+    return HTTPException(
+        status_code=HTTPStatus.NOT_FOUND, detail='Task dont exists'
+    )
 
 
 @router.delete(
@@ -83,43 +873,73 @@ async def read_todos(
     response_model=None,
     status_code=HTTPStatus.NO_CONTENT,
 )
+@query_budget(3)
 async def delete_todo(
-    todo_id: int, session: Session, current_user: CurrentUser
+    todo_id: int, session: Session, current_user: CurrentUser, cache: Cache
 ):
-    todo = await session.scalar(
-        select(Todo).where(todo_id == Todo.id, current_user.id == Todo.user_id)
+    deleted_id = await session.scalar(
+        delete_todos(todo_id == Todo.id, current_user.id == Todo.user_id)
     )
-    if not todo:
-        raise HTTPException(
-            status_code=HTTPStatus.NOT_FOUND, detail='Task dont exists'
+    if deleted_id is None:
+        deleted_id = await session.scalar(
+            delete_todos(
+                todo_id == TodoArchive.id,
+                current_user.id == TodoArchive.user_id,
+                model=TodoArchive,
+            )
         )
+    if deleted_id is None:
+        raise _todo_not_found()
 
-    await session.delete(todo)
     await session.commit()
+    await cache.bump(current_user.id)
+    replica_router.stick(current_user.id)
 
 
 @router.patch(
     '/{todo_id}', response_model=TodoResponse, status_code=HTTPStatus.OK
 )
+@query_budget(3)
 async def update_todo(
     todo_id: int,
     todo: TodoUpdate,
     session: Session,
     current_user: CurrentUser,
+    cache: Cache,
 ):
-    todo_db = await session.scalar(
-        select(Todo).where(todo_id == Todo.id, current_user.id == Todo.user_id)
-    )
-    if not todo_db:
-        raise HTTPException(
-            status_code=HTTPStatus.NOT_FOUND, detail='Task dont exists'
+    where = (todo_id == Todo.id, current_user.id == Todo.user_id)
+    patch = todo.model_dump(exclude_unset=True)
+
+    if not patch:
+        archived = select(
+            *(getattr(TodoArchive, column.key) for column in TODO_COLUMNS)
+        ).where(
+            todo_id == TodoArchive.id, current_user.id == TodoArchive.user_id
         )
+        todos = union_all(
+            select(*TODO_COLUMNS).where(*where), archived
+        ).subquery()
+        row = (await session.execute(select(todos))).first()
+        if row is None:
+            raise _todo_not_found()
+        return row._asdict()
 
-    for key, value in todo.model_dump(exclude_unset=True).items():
-        setattr(todo_db, key, value)
+    row = (
+        await session.execute(
+            update(Todo).where(*where).values(**patch).returning(*TODO_COLUMNS)
+        )
+    ).one_or_none()
+    if row is None:
+        row = (
+            await session.execute(
+                restore_todos(current_user.id, [todo_id], patch)
+            )
+        ).one_or_none()
+    if row is None:
+        raise _todo_not_found()
 
-    session.add(todo_db)
     await session.commit()
-    await session.refresh(todo_db)
+    await cache.bump(current_user.id)
+    replica_router.stick(current_user.id)
 
-    return todo_db
+    return row._asdict()
@@ -1,30 +1,93 @@
 from http import HTTPStatus
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+)
+from sqlalchemy import (
+    Integer,
+    column,
+    delete,
+    func,
+    select,
+    true,
+    update,
+    values,
+)
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from todo_list_api.database import get_session
+from todo_list_api.database import get_session, get_session_factory
+from todo_list_api.models.todos import Todo
 from todo_list_api.models.users import User
-from todo_list_api.schemas.filters import FilterPage
+from todo_list_api.pagination import next_page, paginate
+from todo_list_api.purge import purge_user
+from todo_list_api.querybudget import query_budget
+from todo_list_api.replicas import get_read_session, replica_router
+from todo_list_api.responses import encode, negotiate
+from todo_list_api.routers.todos import TODO_COLUMNS
+from todo_list_api.schemas.filters import FilterInclude, FilterUser
 from todo_list_api.schemas.users import (
     UserCreate,
+    UserDeleteOptions,
     UserResponse,
     UserResponseList,
+    UserTodosResponse,
     UserUpdate,
 )
 from todo_list_api.security import (
+    Principal,
+    forget_token_version,
     get_current_user,
+    get_current_user_db,
     get_password_hash,
 )
+from todo_list_api.settings import Settings
 
 router = APIRouter(prefix='/api/v1/users', tags=['users'])
+settings = Settings()
 
 Session = Annotated[AsyncSession, Depends(get_session)]
-CurrentUser = Annotated[User, Depends(get_current_user)]
-FilterUsers = Annotated[FilterPage, Query()]
+ReadSession = Annotated[AsyncSession, Depends(get_read_session)]
+SessionFactory = Annotated[async_sessionmaker, Depends(get_session_factory)]
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
+CurrentUserDB = Annotated[User, Depends(get_current_user_db)]
+FilterUsers = Annotated[FilterUser, Query()]
+Include = Annotated[FilterInclude, Query()]
+DeleteOptions = Annotated[UserDeleteOptions, Query()]
+
+USER_ORDERING = (User.id,)
+
+
+async def _included_todos(session: AsyncSession, user_ids: list[int]):
+    included = {user_id: [] for user_id in user_ids}
+    if not user_ids:
+        return included
+
+    owners = values(column('id', Integer), name='owners').data([
+        (user_id,) for user_id in user_ids
+    ])
+    todos = (
+        select(Todo.user_id, *TODO_COLUMNS)
+        .where(Todo.user_id == owners.c.id)
+        .order_by(Todo.id)
+        .limit(settings.USER_INCLUDE_TODOS_LIMIT)
+        .lateral('included_todos')
+    )
+    rows = await session.execute(
+        select(todos).select_from(owners).join(todos, true())
+    )
+    for row in rows:
+        todo = row._asdict()
+        included[todo.pop('user_id')].append(todo)
+
+    return included
 
 
 @router.post(
@@ -32,6 +95,7 @@ FilterUsers = Annotated[FilterPage, Query()]
     status_code=HTTPStatus.CREATED,
     response_model=UserResponse,
 )
+@query_budget(3)
 async def create_user(user: UserCreate, session: Session):
     if db_user := await session.scalar(
         select(User).where(
@@ -51,14 +115,14 @@ async def create_user(user: UserCreate, session: Session):
 
     db_user = User(
         username=user.username,
-        password=get_password_hash(user.password),
+        password=await get_password_hash(user.password),
         email=user.email,
     )
     session.add(db_user)
     await session.commit()
     await session.refresh(db_user)
 
-    return db_user
+    return UserResponse.model_validate(db_user)
 
 
 @router.get(
@@ -66,16 +130,41 @@ async def create_user(user: UserCreate, session: Session):
     status_code=HTTPStatus.OK,
     response_model=UserResponseList,
 )
+@query_budget(3)
 async def read_users(
-    session: Session,
+    request: Request,
+    session: ReadSession,
     current_user: CurrentUser,
     filters: FilterUsers,
 ):
-    return {
-        'users': await session.scalars(
-            select(User).limit(filters.limit).offset(filters.offset)
+    rows = await session.execute(
+        paginate(
+            select(User.id, User.username, User.email).where(
+                User.deleted_at.is_(None)
+            ),
+            USER_ORDERING,
+            filters,
+            key='id',
         )
-    }
+    )
+    rows, next_cursor = next_page(rows.all(), USER_ORDERING, filters, key='id')
+    users = [row._asdict() for row in rows]
+    if filters.include == 'todos':
+        included = await _included_todos(
+            session, [user['id'] for user in users]
+        )
+        for user in users:
+            user['todos'] = included[user['id']]
+
+    media_type = negotiate(request.headers.get('Accept'))
+    return Response(
+        encode(
+            {'users': users, 'next_cursor': next_cursor},
+            media_type,
+        ),
+        media_type=media_type,
+        headers={'Vary': 'Accept'},
+    )
 
 
 @router.put(
@@ -83,11 +172,12 @@ async def read_users(
     status_code=HTTPStatus.OK,
     response_model=UserResponse,
 )
+@query_budget(3)
 async def update_user(
     user_id: int,
     user: UserUpdate,
     session: Session,
-    current_user: CurrentUser,
+    current_user: CurrentUserDB,
 ):
     if current_user.id != user_id:
         raise HTTPException(
@@ -97,13 +187,16 @@ async def update_user(
     try:
         current_user.username = user.username
         current_user.email = user.email
-        current_user.password = get_password_hash(user.password)
+        current_user.password = await get_password_hash(user.password)
+        current_user.token_version += 1
 
         session.add(current_user)
         await session.commit()
         await session.refresh(current_user)
+        forget_token_version(current_user.id)
+        replica_router.stick(current_user.id)
 
-        return current_user
+        return UserResponse.model_validate(current_user)
     except IntegrityError as e:
         raise HTTPException(
             status_code=HTTPStatus.CONFLICT,
@@ -116,10 +209,13 @@ async def update_user(
     response_model=None,
     status_code=HTTPStatus.NO_CONTENT,
 )
+@query_budget(2)
 async def remove_user(
     user_id: int,
-    session: Session,
+    session_factory: SessionFactory,
     current_user: CurrentUser,
+    options: DeleteOptions,
+    background_tasks: BackgroundTasks,
 ):
     if current_user.id != user_id:
         raise HTTPException(
@@ -127,23 +223,51 @@ async def remove_user(
             detail='Not enough permissions',
         )
 
-    await session.delete(current_user)
-    await session.commit()
+    async with session_factory() as session:
+        if options.purge == 'background':
+            await session.execute(
+                update(User)
+                .where(User.id == user_id)
+                .values(
+                    deleted_at=func.now(),
+                    token_version=User.token_version + 1,
+                )
+            )
+            background_tasks.add_task(
+                purge_user,
+                session_factory,
+                user_id,
+                settings.PURGE_BATCH_SIZE,
+            )
+        else:
+            await session.execute(delete(User).where(User.id == user_id))
+
+        await session.commit()
+
+    forget_token_version(user_id)
 
 
 @router.get(
     '/{user_id}',
     status_code=HTTPStatus.OK,
-    response_model=UserResponse,
+    response_model=UserTodosResponse | UserResponse,
 )
+@query_budget(2)
 async def read_user(
     user_id: int,
     session: Session,
-    current_user: CurrentUser,
+    current_user: CurrentUserDB,
+    include: Include,
 ):
     if current_user.id != user_id:
         raise HTTPException(
             status_code=HTTPStatus.FORBIDDEN,
             detail='Not enough permissions',
         )
-    return current_user
+
+    user = UserResponse.model_validate(current_user).model_dump()
+    if include.include == 'todos':
+        included = await _included_todos(session, [user_id])
+        user['todos'] = included[user_id]
+
+    return user
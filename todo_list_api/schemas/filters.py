@@ -1,14 +1,52 @@
-from pydantic import BaseModel, Field
+from typing import Literal
+
+from pydantic import BaseModel, Field, model_validator
 
 from todo_list_api.models.todos import TodoState
 
+MAX_PAGE_SIZE = 100
+MAX_CHANGES_SIZE = 1000
+
 
 class FilterPage(BaseModel):
-    limit: int = Field(ge=0, default=10)
+    limit: int = Field(ge=0, le=MAX_PAGE_SIZE, default=10)
     offset: int = Field(ge=0, default=0)
+    cursor: str | None = Field(default=None, max_length=512)
+
+    @model_validator(mode='after')
+    def check_cursor_without_offset(self):
+        if self.cursor and self.offset:
+            raise ValueError('offset cannot be combined with cursor')
+        return self
+
 
+class FilterInclude(BaseModel):
+    include: Literal['todos'] | None = None
 
-class FilterTodo(FilterPage):
+
+class FilterUser(FilterPage, FilterInclude):
+    pass
+
+
+class FilterTodoFields(BaseModel):
     title: str | None = Field(default=None, min_length=3, max_length=255)
     description: str | None = Field(default=None, min_length=3, max_length=510)
     state: TodoState | None = None
+    include_archived: bool = False
+
+
+class FilterTodo(FilterPage, FilterTodoFields):
+    order_by: Literal['id', 'created_at', 'updated_at'] = 'id'
+
+
+class FilterExport(FilterTodoFields):
+    format: Literal['ndjson', 'csv'] = 'ndjson'
+
+
+class FilterChanges(BaseModel):
+    since: str | None = Field(default=None, max_length=512)
+    limit: int = Field(ge=1, le=MAX_CHANGES_SIZE, default=MAX_PAGE_SIZE)
+
+
+class FilterSearch(FilterPage):
+    q: str = Field(min_length=1, max_length=255)
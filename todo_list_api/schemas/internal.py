@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+
+
+class HistogramResponse(BaseModel):
+    count: int
+    sum: float
+    buckets: dict[str, int]
+
+
+class HashingStatsResponse(BaseModel):
+    kind: str
+    workers: int
+    max_pending: int
+    in_flight: int
+    queue_depth: int
+
+
+class PoolStatsResponse(BaseModel):
+    size: int
+    max_overflow: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+    waiting: int
+    wait_time: HistogramResponse
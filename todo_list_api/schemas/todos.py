@@ -1,6 +1,7 @@
 from datetime import datetime
+from typing import Annotated, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 from todo_list_api.models.todos import TodoState
 
@@ -23,9 +24,95 @@ class TodoResponse(TodoBase):
 
 class TodoResponseList(BaseModel):
     todos: list[TodoResponse]
+    next_cursor: str | None = None
+
+
+class TodoChangesResponse(BaseModel):
+    todos: list[TodoResponse]
+    deleted: list[int]
+    watermark: str
+    has_more: bool
+
+
+class TodoSearchResult(TodoResponse):
+    rank: float
+    title_highlight: str
+    description_highlight: str | None
+
+
+class TodoSearchResponseList(BaseModel):
+    results: list[TodoSearchResult]
+    next_cursor: str | None = None
 
 
 class TodoUpdate(BaseModel):
     title: str | None = Field(default=None, min_length=3, max_length=255)
     description: str | None = Field(default=None, max_length=510)
     state: TodoState | None = None
+
+
+class TodoBulkCreate(TodoCreate):
+    op: Literal['create']
+
+
+class TodoBulkUpdate(TodoUpdate):
+    op: Literal['update']
+    id: int
+
+
+class TodoBulkDelete(BaseModel):
+    op: Literal['delete']
+    id: int
+
+
+TodoBulkOperation = Annotated[
+    TodoBulkCreate | TodoBulkUpdate | TodoBulkDelete,
+    Field(discriminator='op'),
+]
+
+
+class TodoBulkRequest(BaseModel):
+    operations: list[TodoBulkOperation] = Field(..., min_length=1)
+
+    @model_validator(mode='after')
+    def check_unique_targets(self):
+        targets = [
+            operation.id
+            for operation in self.operations
+            if operation.op != 'create'
+        ]
+        if len(targets) != len(set(targets)):
+            raise ValueError(
+                'each todo can be targeted by only one update or delete, '
+                'operations run grouped by type'
+            )
+        return self
+
+
+class TodoBulkResult(BaseModel):
+    index: int
+    op: str
+    status: int
+    id: int | None = None
+    todo: TodoResponse | None = None
+    detail: str | None = None
+
+
+class TodoBulkResponse(BaseModel):
+    results: list[TodoBulkResult]
+
+
+class TodoImportOptions(BaseModel):
+    format: Literal['ndjson', 'csv'] | None = None
+    mode: Literal['partial', 'atomic'] = 'partial'
+
+
+class TodoImportError(BaseModel):
+    line: int
+    detail: str
+
+
+class TodoImportResponse(BaseModel):
+    imported: int
+    failed: int
+    errors: list[TodoImportError]
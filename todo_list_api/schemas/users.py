@@ -1,5 +1,9 @@
+from typing import Literal
+
 from pydantic import BaseModel, ConfigDict, EmailStr, Field
 
+from todo_list_api.schemas.todos import TodoResponse
+
 
 class UserBase(BaseModel):
     username: str = Field(..., min_length=1, max_length=255)
@@ -19,9 +23,18 @@ class UserResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class UserTodosResponse(UserResponse):
+    todos: list[TodoResponse]
+
+
 class UserUpdate(UserBase):
     pass
 
 
 class UserResponseList(BaseModel):
-    users: list[UserResponse]
+    users: list[UserTodosResponse | UserResponse]
+    next_cursor: str | None = None
+
+
+class UserDeleteOptions(BaseModel):
+    purge: Literal['cascade', 'background'] = 'cascade'
@@ -1,29 +1,68 @@
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from http import HTTPStatus
+from time import perf_counter
 from zoneinfo import ZoneInfo
 
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from jwt import DecodeError, ExpiredSignatureError, decode, encode
-from pwdlib import PasswordHash
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from todo_list_api.cache import TTLCache
 from todo_list_api.database import get_session
+from todo_list_api.hashing import (
+    HashingExecutor,
+    HashingQueueFullError,
+    check_password,
+    hash_password,
+)
 from todo_list_api.models.users import User
 from todo_list_api.settings import Settings
+from todo_list_api.telemetry import PASSWORD_HASH_SECONDS
 
-pwd_context = PasswordHash.recommended()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='api/v1/auth/token')
 settings = Settings()
+hashing_executor = HashingExecutor(
+    kind=settings.HASHING_EXECUTOR,
+    workers=settings.HASHING_WORKERS,
+    queue_size=settings.HASHING_QUEUE_SIZE,
+)
 
+_MISSING_USER = object()
+token_versions = TTLCache(
+    maxsize=settings.TOKEN_VERSION_CACHE_SIZE,
+    ttl=settings.TOKEN_VERSION_CACHE_SECONDS,
+)
 
-def get_password_hash(password: str):
-    return pwd_context.hash(password)
 
+@dataclass(frozen=True, slots=True)
+class Principal:
+    id: int
+    token_version: int
 
-def verify_password(plain_password: str, hashed_password: str):
-    return pwd_context.verify(plain_password, hashed_password)
+
+async def _run_hashing(fn, *args):
+    start = perf_counter()
+    try:
+        result = await hashing_executor.run(fn, *args)
+    except HashingQueueFullError as e:
+        raise HTTPException(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            detail='Server is busy, try again later',
+            headers={'Retry-After': '1'},
+        ) from e
+    PASSWORD_HASH_SECONDS.labels(fn.__name__).observe(perf_counter() - start)
+    return result
+
+
+async def get_password_hash(password: str):
+    return await _run_hashing(hash_password, password)
+
+
+async def verify_password(plain_password: str, hashed_password: str):
+    return await _run_hashing(check_password, plain_password, hashed_password)
 
 
 def create_access_token(data: dict):
@@ -37,6 +76,32 @@ def create_access_token(data: dict):
     return encode(claims, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
+def create_user_token(user: User | Principal):
+    return create_access_token({
+        'sub': str(user.id),
+        'ver': user.token_version,
+    })
+
+
+async def get_token_version(session: AsyncSession, user_id: int):
+    version = token_versions.get(user_id)
+    if version is None:
+        version = await session.scalar(
+            select(User.token_version).where(
+                User.id == user_id, User.deleted_at.is_(None)
+            )
+        )
+        if version is None:
+            version = _MISSING_USER
+        token_versions.set(user_id, version)
+
+    return None if version is _MISSING_USER else version
+
+
+def forget_token_version(user_id: int):
+    token_versions.pop(user_id)
+
+
 async def get_current_user(
     session: AsyncSession = Depends(get_session),
     token: str = Depends(oauth2_scheme),
@@ -51,15 +116,31 @@ async def get_current_user(
         payload = decode(
             token, settings.SECRET_KEY, algorithms=settings.ALGORITHM
         )
-        subject_email = payload.get('sub')
-        if not subject_email:
+        subject_id = payload.get('sub')
+        token_version = payload.get('ver')
+        if not subject_id or not isinstance(token_version, int):
             raise credentials_exception
-    except (DecodeError, ExpiredSignatureError) as e:
+        user_id = int(subject_id)
+    except (DecodeError, ExpiredSignatureError, ValueError) as e:
         raise credentials_exception from e
 
-    if user_db := await session.scalar(
-        select(User).where(User.email == subject_email)
-    ):
+    current_version = await get_token_version(session, user_id)
+    if current_version is None:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail='User doesnt exists',
+        )
+    if current_version != token_version:
+        raise credentials_exception
+
+    return Principal(id=user_id, token_version=token_version)
+
+
+async def get_current_user_db(
+    session: AsyncSession = Depends(get_session),
+    principal: Principal = Depends(get_current_user),
+):
+    if user_db := await session.get(User, principal.id):
         return user_db
     else:
         raise HTTPException(
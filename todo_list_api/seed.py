@@ -0,0 +1,267 @@
+import argparse
+import asyncio
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from multiprocessing import get_context
+from time import perf_counter
+
+from psycopg import sql
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    create_async_engine,
+)
+
+from todo_list_api.formats import encode_copy
+from todo_list_api.hashing import hash_password
+from todo_list_api.models.todos import Todo, TodoState
+from todo_list_api.models.users import User
+from todo_list_api.settings import Settings
+
+DEFAULT_STATES = {'draft': 1, 'todo': 3, 'doing': 2, 'done': 4}
+WORDS = (
+    'buy milk eggs bread call mom pay rent fix bike write report review '
+    'code book flight clean kitchen water plants send invoice plan trip '
+    'read chapter renew passport update resume walk dog order groceries'
+).split()
+
+
+def _copy_statement(model, keys: tuple[str, ...]):
+    return sql.SQL('COPY {table} ({columns}) FROM STDIN').format(
+        table=sql.Identifier(model.__tablename__),
+        columns=sql.SQL(', ').join(
+            sql.Identifier(model.__mapper__.columns[key].name) for key in keys
+        ),
+    )
+
+
+COPY_USERS = _copy_statement(
+    User, ('username', 'email', 'password', 'created_at', 'updated_at')
+)
+COPY_TODOS = _copy_statement(
+    Todo,
+    ('user_id', 'title', 'description', 'state', 'created_at', 'updated_at'),
+)
+
+
+@dataclass(frozen=True, slots=True)
+class SeedOptions:
+    users: int = 1000
+    todos: int = 100_000
+    skew: float = 1.1
+    states: dict[str, int] = field(default_factory=DEFAULT_STATES.copy)
+    days: float = 365
+    workers: int | None = None
+    chunk_size: int = 50_000
+    password: str = 'password'
+    prefix: str = 'seed'
+    seed: int = 0
+
+
+@dataclass(frozen=True, slots=True)
+class TodoChunk:
+    owners: tuple[tuple[int, int], ...]
+    seed: int
+    states: tuple[str, ...]
+    weights: tuple[int, ...]
+    start: datetime
+    seconds: float
+
+    @property
+    def size(self):
+        return sum(count for _, count in self.owners)
+
+
+def zipf_counts(total: int, users: int, skew: float, rng: random.Random):
+    weights = [1 / rank**skew for rank in range(1, users + 1)]
+    scale = total / sum(weights)
+    counts = [int(weight * scale) for weight in weights]
+    for index in range(total - sum(counts)):
+        counts[index % users] += 1
+
+    rng.shuffle(counts)
+    return counts
+
+
+def split_chunks(owners: list[tuple[int, int]], chunk_size: int):
+    chunk, size = [], 0
+    for user_id, count in owners:
+        remaining = count
+        while remaining:
+            taken = min(remaining, chunk_size - size)
+            chunk.append((user_id, taken))
+            size += taken
+            remaining -= taken
+            if size == chunk_size:
+                yield tuple(chunk)
+                chunk, size = [], 0
+
+    if chunk:
+        yield tuple(chunk)
+
+
+def _timestamps(rng: random.Random, start: datetime, seconds: float):
+    offset = rng.random() * seconds
+    created_at = start + timedelta(seconds=offset)
+    updated_at = created_at + timedelta(
+        seconds=rng.random() * (seconds - offset)
+    )
+    return created_at, updated_at
+
+
+def build_todos(chunk: TodoChunk):
+    rng = random.Random(chunk.seed)
+    states = iter(rng.choices(chunk.states, chunk.weights, k=chunk.size))
+    return encode_copy(
+        (
+            user_id,
+            ' '.join(rng.choices(WORDS, k=3)),
+            ' '.join(rng.choices(WORDS, k=8)),
+            next(states),
+            *_timestamps(rng, chunk.start, chunk.seconds),
+        )
+        for user_id, count in chunk.owners
+        for _ in range(count)
+    )
+
+
+async def _copy(conn: AsyncConnection, statement, data: bytes):
+    raw_connection = await conn.get_raw_connection()
+    async with raw_connection.driver_connection.cursor() as cursor:
+        async with cursor.copy(statement) as copy:
+            await copy.write(data)
+
+
+async def _copy_users(
+    conn: AsyncConnection,
+    options: SeedOptions,
+    rng: random.Random,
+    start: datetime,
+    seconds: float,
+):
+    hashed_password = hash_password(options.password)
+    first_id = await conn.scalar(select(func.coalesce(func.max(User.id), 0)))
+    user_rows = []
+    for index in range(first_id, first_id + options.users):
+        created_at, _ = _timestamps(rng, start, seconds)
+        user_rows.append((
+            f'{options.prefix}{index}',
+            f'{options.prefix}{index}@example.com',
+            hashed_password,
+            created_at,
+            created_at,
+        ))
+    await _copy(conn, COPY_USERS, encode_copy(user_rows))
+    user_ids = await conn.scalars(
+        select(User.id).where(User.id > first_id).order_by(User.id)
+    )
+    counts = zipf_counts(options.todos, options.users, options.skew, rng)
+    return list(zip(user_ids.all(), counts))
+
+
+async def _copy_todos(
+    engine: AsyncEngine, chunks: list[TodoChunk], workers: int
+):
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(workers)
+
+    async def load(pool, chunk: TodoChunk):
+        async with semaphore:
+            data = await loop.run_in_executor(pool, build_todos, chunk)
+            async with engine.begin() as conn:
+                await _copy(conn, COPY_TODOS, data)
+        return chunk.size
+
+    with ProcessPoolExecutor(workers, mp_context=get_context('spawn')) as pool:
+        loaded = await asyncio.gather(*(load(pool, chunk) for chunk in chunks))
+
+    return sum(loaded)
+
+
+async def seed_database(database_url: str, options: SeedOptions):
+    rng = random.Random(options.seed)
+    workers = options.workers or os.cpu_count() or 1
+    seconds = timedelta(days=options.days).total_seconds()
+    engine = create_async_engine(database_url, pool_size=workers)
+
+    try:
+        async with engine.begin() as conn:
+            now = await conn.scalar(select(func.localtimestamp()))
+            start = now - timedelta(seconds=seconds)
+            owners = await _copy_users(conn, options, rng, start, seconds)
+
+        chunks = [
+            TodoChunk(
+                owners=chunk,
+                seed=rng.getrandbits(64),
+                states=tuple(options.states),
+                weights=tuple(options.states.values()),
+                start=start,
+                seconds=seconds,
+            )
+            for chunk in split_chunks(owners, options.chunk_size)
+        ]
+        return await _copy_todos(engine, chunks, workers)
+    finally:
+        await engine.dispose()
+
+
+def parse_states(value: str):
+    states = {}
+    for part in value.split(','):
+        state, _, weight = part.partition('=')
+        if state not in TodoState.__members__ or not weight.isdigit():
+            raise argparse.ArgumentTypeError(f'invalid state entry {part!r}')
+        states[state] = int(weight)
+
+    return states
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Load synthetic users and todos through COPY.'
+    )
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--todos', type=int, default=100_000)
+    parser.add_argument(
+        '--skew', type=float, default=1.1, help='Zipf exponent of todos'
+    )
+    parser.add_argument('--states', type=parse_states, default=DEFAULT_STATES)
+    parser.add_argument('--days', type=float, default=365)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--chunk-size', type=int, default=50_000)
+    parser.add_argument('--password', default='password')
+    parser.add_argument('--prefix', default='seed')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--database-url')
+    args = parser.parse_args()
+
+    if args.database_url is None:
+        args.database_url = Settings().DATABASE_URL
+
+    started = perf_counter()
+    options = SeedOptions(
+        users=args.users,
+        todos=args.todos,
+        skew=args.skew,
+        states=args.states,
+        days=args.days,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        password=args.password,
+        prefix=args.prefix,
+        seed=args.seed,
+    )
+    loaded = asyncio.run(seed_database(args.database_url, options))
+    print(
+        f'{args.users} users and {loaded} todos loaded in '
+        f'{perf_counter() - started:.1f}s'
+    )
+
+
+if __name__ == '__main__':
+    main()
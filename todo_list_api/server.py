@@ -0,0 +1,22 @@
+import gc
+import os
+
+from prometheus_client import multiprocess
+
+from todo_list_api.database import engine
+from todo_list_api.replicas import replica_router
+
+
+def when_ready(server):
+    gc.collect()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    for pooled_engine in (engine, *replica_router.replicas):
+        pooled_engine.sync_engine.dispose(close=False)
+
+
+def child_exit(server, worker):
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        multiprocess.mark_process_dead(worker.pid)
@@ -1,4 +1,7 @@
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Annotated, Literal
+
+from pydantic import field_validator, model_validator
+from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
 
 
 class Settings(BaseSettings):
@@ -6,6 +9,63 @@ class Settings(BaseSettings):
         env_file='.env', env_file_encoding='utf-8'
     )
     DATABASE_URL: str
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_RECYCLE: int = 200
+    DATABASE_POOL_TIMEOUT: float = 30.0
+    DATABASE_POOL_PRE_PING: bool = False
+    DATABASE_POOL_USE_LIFO: bool = False
+    DATABASE_STATEMENT_TIMEOUT: int | None = None
+    DATABASE_REPLICA_URLS: Annotated[list[str], NoDecode] = []
+    REPLICA_EJECT_SECONDS: int = 30
+    READ_YOUR_WRITES_SECONDS: int = 5
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+    TOKEN_VERSION_CACHE_SECONDS: int = 30
+    TOKEN_VERSION_CACHE_SIZE: int = 10_000
+    HASHING_EXECUTOR: Literal['process', 'thread'] = 'process'
+    HASHING_WORKERS: int | None = None
+    HASHING_QUEUE_SIZE: int = 64
+    BULK_MAX_OPERATIONS: int = 500
+    EXPORT_FETCH_SIZE: int = 1000
+    IMPORT_CHUNK_SIZE: int = 5000
+    IMPORT_MAX_ERRORS: int = 100
+    TODO_CACHE_SECONDS: int = 30
+    TODO_CACHE_SIZE: int = 10_000
+    CACHE_INVALIDATION: bool | None = None
+    TODO_EVENTS_QUEUE_SIZE: int = 100
+    TODO_EVENTS_KEEPALIVE_SECONDS: float = 15
+    TODO_SYNC_LAG_SECONDS: int = 10
+    TODO_TOMBSTONE_RETENTION_DAYS: int = 30
+    ARCHIVE_DONE_DAYS: int = 30
+    ARCHIVE_TRASH_DAYS: int = 7
+    ARCHIVE_BATCH_SIZE: int = 1000
+    TRASH_RETENTION_DAYS: int = 30
+    PURGE_BATCH_SIZE: int = 1000
+    USER_INCLUDE_TODOS_LIMIT: int = 50
+    SERVER_WORKERS: int | None = None
+    SERVER_MAX_REQUESTS: int = 10_000
+    SERVER_MAX_REQUESTS_JITTER: int = 1000
+    STARTUP_WARMUP: bool = False
+    STARTUP_WARMUP_CONNECTIONS: int = 2
+    INTERNAL_TOKEN: str | None = None
+    DEBUG: bool = False
+    QUERY_REPEAT_LIMIT: int = 2
+
+    @field_validator('DATABASE_REPLICA_URLS', mode='before')
+    @classmethod
+    def split_replica_urls(cls, value):
+        if isinstance(value, str):
+            return [url.strip() for url in value.split(',') if url.strip()]
+        return value
+
+    @model_validator(mode='after')
+    def default_cache_invalidation(self):
+        if self.CACHE_INVALIDATION is None:
+            self.CACHE_INVALIDATION = (
+                self.TODO_CACHE_SECONDS > 0
+                or self.TOKEN_VERSION_CACHE_SECONDS > 0
+                or bool(self.DATABASE_REPLICA_URLS)
+            )
+        return self
@@ -0,0 +1,112 @@
+import asyncio
+import logging
+from time import perf_counter
+
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from todo_list_api import IMPORT_STARTED
+from todo_list_api.models.users import User
+from todo_list_api.routers.todos import list_todos_query
+from todo_list_api.schemas.filters import FilterTodo, FilterUser
+from todo_list_api.schemas.todos import (
+    TodoCreate,
+    TodoResponseList,
+    TodoUpdate,
+)
+from todo_list_api.schemas.users import UserCreate, UserResponseList
+from todo_list_api.security import get_password_hash, hashing_executor
+
+logger = logging.getLogger('uvicorn.error')
+
+
+class StartupTimer:
+    def __init__(self, started: float):
+        self.started = started
+        self.last = started
+        self.phases: dict[str, float] = {}
+
+    def mark(self, phase: str):
+        now = perf_counter()
+        self.phases[phase] = now - self.last
+        self.last = now
+
+    @property
+    def total(self):
+        return self.last - self.started
+
+    def summary(self):
+        phases = ', '.join(
+            f'{phase}={seconds * 1000:.1f}ms'
+            for phase, seconds in self.phases.items()
+        )
+        return f'startup took {self.total * 1000:.1f}ms ({phases})'
+
+
+startup_timer = StartupTimer(IMPORT_STARTED)
+
+
+def hot_statements():
+    return [
+        select(User).where(
+            User.email == 'warm-up@example.com', User.deleted_at.is_(None)
+        ),
+        select(User.token_version).where(
+            User.id == 0, User.deleted_at.is_(None)
+        ),
+        list_todos_query(0, FilterTodo()),
+    ]
+
+
+async def open_connections(engine: AsyncEngine, count: int):
+    connections = await asyncio.gather(
+        *(engine.connect() for _ in range(count))
+    )
+    for connection in connections:
+        await connection.close()
+
+
+async def compile_statements(engine: AsyncEngine):
+    async with AsyncSession(engine) as session:
+        for statement in hot_statements():
+            await session.execute(statement)
+
+
+def warm_validators():
+    FilterTodo.model_validate({'title': 'warm-up', 'state': 'todo'})
+    FilterUser.model_validate({'include': 'todos'})
+    TodoCreate.model_validate({'title': 'warm-up', 'state': 'todo'})
+    TodoUpdate.model_validate({'state': 'done'})
+    UserCreate.model_validate({
+        'username': 'warm-up',
+        'email': 'warm-up@example.com',
+        'password': 'warm-up-password',
+    })
+    TodoResponseList.model_validate({'todos': []}).model_dump_json()
+    UserResponseList.model_validate({'users': []}).model_dump_json()
+
+
+async def warm_hashing():
+    await asyncio.gather(
+        *(
+            get_password_hash('warm-up-password')
+            for _ in range(hashing_executor.workers)
+        )
+    )
+
+
+async def warm_up(engine: AsyncEngine, connections: int, timer: StartupTimer):
+    try:
+        await open_connections(engine, connections)
+        timer.mark('connections')
+        await compile_statements(engine)
+        timer.mark('statements')
+    except (OSError, SQLAlchemyError) as e:
+        logger.warning('Skipping database warm-up: %s', e)
+        timer.mark('database')
+
+    warm_validators()
+    timer.mark('validators')
+    await warm_hashing()
+    timer.mark('hashing')
@@ -0,0 +1,141 @@
+import os
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from time import perf_counter
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+
+from todo_list_api.metrics import LATENCY_BUCKETS
+
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+
+REQUESTS = Counter(
+    'http_requests_total',
+    'HTTP requests by route and status code.',
+    ('method', 'route', 'status'),
+)
+REQUEST_SECONDS = Histogram(
+    'http_request_duration_seconds',
+    'HTTP request latency by route.',
+    ('method', 'route'),
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    'http_requests_in_flight',
+    'HTTP requests currently being served.',
+    ('method',),
+    multiprocess_mode='livesum',
+)
+DB_STATEMENTS = Histogram(
+    'db_statements_per_request',
+    'Database statements executed per HTTP request.',
+    ('route',),
+    buckets=STATEMENT_BUCKETS,
+)
+DB_SECONDS = Histogram(
+    'db_time_per_request_seconds',
+    'Time spent executing database statements per HTTP request.',
+    ('route',),
+    buckets=LATENCY_BUCKETS,
+)
+PASSWORD_HASH_SECONDS = Histogram(
+    'password_hash_duration_seconds',
+    'Time to hash or verify a password, including queueing.',
+    ('operation',),
+    buckets=LATENCY_BUCKETS,
+)
+
+
+@dataclass(slots=True)
+class QueryLog:
+    count: int = 0
+    seconds: float = 0.0
+    statements: list[str] = field(default_factory=list)
+
+
+db_usage: ContextVar[QueryLog | None] = ContextVar('db_usage', default=None)
+
+
+def record_statement(statement: str, elapsed: float):
+    usage = db_usage.get()
+    if usage is not None:
+        usage.count += 1
+        usage.seconds += elapsed
+        usage.statements.append(statement)
+
+
+def render_metrics():
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        from prometheus_client import multiprocess  # noqa: PLC0415
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+
+    return generate_latest(registry)
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+        self._route_metrics = {}
+        self._request_counters = {}
+
+    def _observe(self, method, path, status_code, elapsed, usage):
+        counter = self._request_counters.get((method, path, status_code))
+        if counter is None:
+            counter = REQUESTS.labels(method, path, str(status_code))
+            self._request_counters[method, path, status_code] = counter
+
+        route_metrics = self._route_metrics.get((method, path))
+        if route_metrics is None:
+            route_metrics = (
+                REQUEST_SECONDS.labels(method, path),
+                DB_STATEMENTS.labels(path),
+                DB_SECONDS.labels(path),
+            )
+            self._route_metrics[method, path] = route_metrics
+
+        counter.inc()
+        request_seconds, db_statements, db_seconds = route_metrics
+        request_seconds.observe(elapsed)
+        db_statements.observe(usage.count)
+        db_seconds.observe(usage.seconds)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        method = scope['method']
+        usage = QueryLog()
+        token = db_usage.set(usage)
+        in_flight = REQUESTS_IN_FLIGHT.labels(method)
+        in_flight.inc()
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = perf_counter() - start
+            in_flight.dec()
+            db_usage.reset(token)
+
+            route = scope.get('route')
+            path = route.path if route is not None else '<unmatched>'
+            self._observe(method, path, status_code, elapsed, usage)